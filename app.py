@@ -1,62 +1,121 @@
 import json
 import os
-from datetime import datetime
-
-from flask import Flask, render_template, request, redirect, url_for
-
-from main import FFRPG, FlyRod, Leader, Fly
+import secrets
+import time
+import zlib
+
+import numpy as np
+from flask import Flask, Response, g, jsonify, render_template, request, redirect, session, url_for
+from markupsafe import Markup
+
+from game_store import GameStore
+from leaderboard import Leaderboard, format_board
+from live_view import BOARD_SIZE, LiveView
+from location_pool import LocationPool
+from metrics import metrics, perf_counter
+from replay import export_record
+from shared_waters import SharedLocations
+from main import (
+    FFRPG,
+    FLY_CATEGORIES,
+    FLY_PATTERNS,
+    FLY_SIZES,
+    LEADER_DIAMETERS,
+    LEADER_LENGTHS,
+    LEADER_LINE_TYPES,
+    PATTERN_TO_CATEGORY,
+    ROD_LENGTHS,
+    ROD_MATERIALS,
+    ROD_WEIGHTS,
+    Fly,
+    FlyRod,
+    Leader,
+    format_position,
+)
 
 
 app = Flask(__name__)
 # For development only; change this for any real deployment
 app.secret_key = "dev-secret-key"
 
-LEADERBOARD_FILE = "leaderboard.json"
-
-# Single in-memory game instance (good enough for local play)
-game = FFRPG()
-last_message = "Welcome to FFRPG (web lofi edition). Use the controls below to play."
-
-# Static option sets mirroring the console game
-LEADER_LINE_TYPES = ["Fluorocarbon", "Monofilament", "Braided"]
-LEADER_DIAMETERS = [
-    "7X (2.0kg)",
-    "6X (2.5kg)",
-    "5X (3.0kg)",
-    "4X (3.5kg)",
-    "3X (4.5kg)",
-    "2X (6.0kg)",
-    "1X (7.0kg)",
-    "0X (8.0kg)",
-]
-
-ROD_LENGTHS = [7, 8, 9, 10]
-ROD_WEIGHTS = [3, 4, 5, 6, 7, 8]
-ROD_MATERIALS = ["Graphite", "Fiberglass", "Bamboo"]
-
-FLY_CATEGORIES = ["Dry Flies", "Wet Flies", "Nymphs", "Streamers"]
-FLY_PATTERNS = {
-    "Dry Flies": ["Adams", "Elk Hair Caddis", "Parachute Hopper", "Royal Wulff"],
-    "Wet Flies": ["Partridge & Orange", "Soft Hackle Hare's Ear", "Tellico Nymph"],
-    "Nymphs": ["Pheasant Tail", "Gold-Ribbed Hare's Ear", "Zebra Midge", "Copper John"],
-    "Streamers": ["Woolly Bugger", "Clouser Minnow", "Muddler Minnow", "Zonker"],
-}
-FLY_SIZES = [22, 20, 18, 16, 14, 12, 10, 8, 6, 4]
-
-# Helper to derive category from pattern (for robustness)
-PATTERN_TO_CATEGORY = {
-    pattern: category
-    for category, patterns in FLY_PATTERNS.items()
-    for pattern in patterns
-}
-
-
-def ensure_basic_setup():
+# leaderboard.json is the old storage format; it's imported once into a new database
+LEADERBOARD_DB = os.environ.get("FFRPG_LEADERBOARD_DB", "leaderboard.db")
+LEADERBOARD_JSON = "leaderboard.json"
+leaderboard = Leaderboard(LEADERBOARD_DB, import_json=LEADERBOARD_JSON)
+
+# One game per browser session, bounded in number and idle lifetime
+MAX_GAMES = int(os.environ.get("FFRPG_MAX_GAMES", "5000"))
+GAME_IDLE_TTL = float(os.environ.get("FFRPG_GAME_IDLE_TTL", "3600"))
+GRID_SIZE = int(os.environ.get("FFRPG_GRID_SIZE", "10"))
+
+# Ready-made maps per terrain type, refilled in the background; 0 turns the pool off
+POOL_DEPTH = int(os.environ.get("FFRPG_POOL_DEPTH", "4"))
+location_pool = LocationPool(GRID_SIZE, depth=POOL_DEPTH).start() if POOL_DEPTH > 0 else None
+
+# FFRPG_SHARED_WATERS=1 puts every player at a location on the same map
+SHARED_WATERS = os.environ.get("FFRPG_SHARED_WATERS") == "1"
+shared_locations = SharedLocations(GRID_SIZE) if SHARED_WATERS else None
+
+
+def new_game():
+    game = FFRPG(GRID_SIZE)
+    game.location_pool = location_pool
+    game.shared_locations = shared_locations
+    return game
+
+
+games = GameStore(max_games=MAX_GAMES, idle_ttl=GAME_IDLE_TTL, factory=new_game)
+
+# Upper bound on casts accepted by one /api/casts request
+MAX_BATCH_CASTS = 1000
+
+# Pages with a live stream send this header on their background form posts
+STREAM_HEADER = "X-FFRPG-Stream"
+# A stream also looks for changes nobody announced (moving fish, other players'
+# leaderboard entries) this often, and sends a keep-alive comment when idle
+STREAM_POLL_SECONDS = 1.0
+STREAM_KEEPALIVE_SECONDS = 15.0
+
+# Starts every index page ETag, so tags handed out by an earlier server process never match
+PAGE_TAG_PREFIX = secrets.token_hex(4)
+
+# /metrics answers only these clients; it's meant for a local dashboard or scraper
+METRICS_CLIENTS = ("127.0.0.1", "::1")
+
+
+@app.before_request
+def start_request_timer():
+    if metrics.enabled:
+        g.request_start = perf_counter()
+
+
+@app.after_request
+def record_request_time(response):
+    start = g.get("request_start")
+    if start is not None:
+        route = request.url_rule.rule if request.url_rule else "unmatched"
+        name = f"route.{request.method} {route}"
+        # The index form multiplexes every action onto POST /
+        action = request.form.get("action") if request.method == "POST" and route == "/" else None
+        if action:
+            name = f"{name} {action}"
+        metrics.observe(name, perf_counter() - start)
+    return response
+
+
+def current_session():
+    """Return the GameSession belonging to the requesting browser."""
+    sid = session.get("sid")
+    if not sid:
+        sid = secrets.token_urlsafe(16)
+        session["sid"] = sid
+    return games.get(sid)
+
+
+def ensure_basic_setup(game):
     """Ensure the game has some sensible defaults for web play."""
-    global game, last_message
     if not game.current_location:
-        game.current_location = "Mountain Stream"
-        game.generate_location("stream")
+        game.set_location("Mountain Stream")
     if not game.current_rod:
         game.current_rod = FlyRod(9, 5, "Graphite")
     if not game.current_leader:
@@ -65,88 +124,50 @@ def ensure_basic_setup():
         game.current_fly = Fly("Adams", "Dry Flies", 16)
 
 
-def load_leaderboard():
-    if not os.path.exists(LEADERBOARD_FILE):
-        return []
-    try:
-        with open(LEADERBOARD_FILE, "r", encoding="utf-8") as f:
-            data = json.load(f)
-            if isinstance(data, list):
-                return data
-    except Exception:
-        pass
-    return []
-
-
-def save_leaderboard(entries):
-    try:
-        with open(LEADERBOARD_FILE, "w", encoding="utf-8") as f:
-            json.dump(entries, f, indent=2)
-    except Exception:
-        # For this simple app, silently ignore write errors
-        pass
-
-
 def update_leaderboard(player):
-    """Record the player's progress in a simple JSON leaderboard.
+    """Record the player's progress on the leaderboard.
 
     Each entry keeps track of player name, total fish caught, best fish size,
     and total XP. Multiple sessions by the same name will just update/merge
     the existing record.
     """
-    entries = load_leaderboard()
-
-    total_fish = len(player.catch_record)
-    best_size = max((size for _, size in player.catch_record), default=0)
-    xp = player.xp
-
-    # Find existing entry by name
-    existing = None
-    for e in entries:
-        if e.get("name") == player.name:
-            existing = e
-            break
-
-    if existing is None:
-        entries.append(
-            {
-                "name": player.name,
-                "total_fish": total_fish,
-                "best_size": best_size,
-                "xp": xp,
-                "last_updated": datetime.utcnow().isoformat() + "Z",
-            }
-        )
-    else:
-        existing["total_fish"] = total_fish
-        existing["best_size"] = best_size
-        existing["xp"] = xp
-        existing["last_updated"] = datetime.utcnow().isoformat() + "Z"
-
-    # Sort by total fish, then best size, then xp
-    entries.sort(key=lambda e: (-e.get("total_fish", 0), -e.get("best_size", 0), -e.get("xp", 0)))
-    save_leaderboard(entries)
+    record = player.catch_record
+    start = perf_counter()
+    leaderboard.record(player.name, len(record), record.best_size, player.xp)
+    metrics.observe("leaderboard.write", perf_counter() - start)
 
 
 @app.route("/", methods=["GET", "POST"])
 def index():
-    global game, last_message
+    state = current_session()
+    with state.lock:
+        response = handle_index(state)
+        if request.method == "POST":
+            state.notify()
+            # The page's stream brings it the changes, so skip the redirect and reload
+            if request.headers.get(STREAM_HEADER):
+                return "", 204
+        return response
+
+
+def handle_index(state):
+    game = state.game
 
     if request.method == "POST":
         action = request.form.get("action")
 
         if action == "reset":
-            game = FFRPG()
-            last_message = "New game started. Build gear, pick a location, and cast!"
+            state.game = games.factory()
+            state.last_message = "New game started. Build gear, pick a location, and cast!"
             return redirect(url_for("index"))
 
         if action == "set_name":
             name = (request.form.get("player_name") or "").strip()
             if name:
                 game.player.name = name
-                last_message = f"Name set to: {name}"
+                state.last_message = f"Name set to: {name}"
             else:
-                last_message = "Name cannot be empty."
+                state.last_message = "Name cannot be empty."
             return redirect(url_for("index"))
 
         if action == "build_leader":
@@ -162,11 +183,11 @@ def index():
                 length_val = int(request.form.get("leader_length") or 9)
             except ValueError:
                 length_val = 9
-            if length_val < 7 or length_val > 12:
+            if length_val not in LEADER_LENGTHS:
                 length_val = 9
 
             game.current_leader = Leader(material, tippet, length_val)
-            last_message = f"Leader built: {material}, {tippet}, {length_val} feet."
+            state.last_message = f"Leader built: {material}, {tippet}, {length_val} feet."
             return redirect(url_for("index"))
 
         if action == "build_rod":
@@ -189,7 +210,7 @@ def index():
                 material = "Graphite"
 
             game.current_rod = FlyRod(length_val, weight_val, material)
-            last_message = f"Rod built: {length_val}' {weight_val}-weight {material}."
+            state.last_message = f"Rod built: {length_val}' {weight_val}-weight {material}."
             return redirect(url_for("index"))
 
         if action == "build_fly":
@@ -208,52 +229,261 @@ def index():
                 size_val = 16
 
             game.current_fly = Fly(selected_pattern, category, size_val)
-            last_message = f"Fly selected: {selected_pattern}, {category}, size {size_val}."
+            state.last_message = f"Fly selected: {selected_pattern}, {category}, size {size_val}."
             return redirect(url_for("index"))
 
         if action == "location":
             chosen = request.form.get("location") or "Mountain Stream"
-            location_type = "river"
-            if "Stream" in chosen:
-                location_type = "stream"
-            elif "Lake" in chosen:
-                location_type = "lake"
-            game.generate_location(location_type)
-            game.current_location = chosen
-            last_message = f"Location set to: {chosen}."
+            game.set_location(chosen)
+            state.last_message = f"Location set to: {chosen}."
+            return redirect(url_for("index"))
+
+        if action == "view":
+            # The pan buttons send a direction; Go sends the typed position
+            target = request.form.get("pan") or request.form.get("view", "")
+            if game.move_view(target):
+                row0, row1, col0, col1 = game.visible_window()
+                state.last_message = (
+                    f"Viewing {format_position(row0, col0)} to {format_position(row1 - 1, col1 - 1)}."
+                )
+            else:
+                state.last_message = "Enter a position on the map (e.g. b3) to move the view to."
             return redirect(url_for("index"))
 
         if action == "cast":
-            # Track catches before/after this cast
-            before_catches = len(game.player.catch_record)
-            ensure_basic_setup()
             cast = request.form.get("cast", "").strip()
-            result = game.start_fishing_web(cast or None)
-            last_message = result
-            after_catches = len(game.player.catch_record)
-            if after_catches > before_catches:
-                update_leaderboard(game.player)
+            run_casts(state, [cast])
             return redirect(url_for("index"))
 
     # GET request: render current game state
+    return render_index(state)
+
+
+# (template, html) of the last controls.html render
+_controls = (None, None)
+# (leaderboard change_key, entries) of the last top-of-board read, shared by every page
+_top_entries = (None, None)
+
+
+def controls_html():
+    """The option forms, rendered once.
+
+    Jinja hands back a new template object only when controls.html is
+    reloaded (in debug mode), so that is the only time they're rendered again.
+    """
+    global _controls
+    template = app.jinja_env.get_template("controls.html")
+    if _controls[0] is not template:
+        _controls = (template, Markup(template.render(
+            leader_line_types=LEADER_LINE_TYPES,
+            leader_diameters=LEADER_DIAMETERS,
+            rod_lengths=ROD_LENGTHS,
+            rod_weights=ROD_WEIGHTS,
+            rod_materials=ROD_MATERIALS,
+            fly_categories=FLY_CATEGORIES,
+            fly_patterns=FLY_PATTERNS,
+            fly_sizes=FLY_SIZES,
+        )))
+    return _controls[1]
+
+
+def leaderboard_text(state):
+    """The session's leaderboard panel, read again only after a board write or a rename."""
+    global _top_entries
+    name = state.game.player.name
+    version = leaderboard.change_key()
+    if state.board_key != (version, name):
+        if _top_entries[0] != version:
+            _top_entries = (version, leaderboard.top(BOARD_SIZE))
+        state.board_text = format_board(_top_entries[1], name, leaderboard.rank(name))
+        state.board_key = (version, name)
+    return state.board_text
+
+
+def render_index(state):
+    """The page for the session's current state, or a 304 if the browser has it.
+
+    The ETag combines the session's version, which every change made
+    through a request bumps, with checksums of the frame and the
+    leaderboard panel. Those also change on their own, as fish move and
+    other players catch fish. Both come from caches, so answering a
+    repeat view skips the template entirely.
+    """
+    game = state.game
     display_text = game.display_game(as_string=True)
-    return render_template(
-        "index.html",
-        display_text=display_text,
-        last_message=last_message,
-        leaderboard=load_leaderboard()[:10],  # top 10
-        player_name=game.player.name,
-        leader_line_types=LEADER_LINE_TYPES,
-        leader_diameters=LEADER_DIAMETERS,
-        rod_lengths=ROD_LENGTHS,
-        rod_weights=ROD_WEIGHTS,
-        rod_materials=ROD_MATERIALS,
-        fly_categories=FLY_CATEGORIES,
-        fly_patterns=FLY_PATTERNS,
-        fly_sizes=FLY_SIZES,
+    board_text = leaderboard_text(state)
+    etag = "-".join([
+        PAGE_TAG_PREFIX,
+        str(state.version),
+        f"{zlib.crc32(display_text.encode()):08x}",
+        f"{zlib.crc32(board_text.encode()):08x}",
+    ])
+    if etag in request.if_none_match:
+        response = Response(status=304)
+    else:
+        response = Response(render_template(
+            "index.html",
+            display_text=display_text,
+            last_message=state.last_message,
+            leaderboard_text=board_text,
+            player_name=game.player.name,
+            controls_html=controls_html(),
+        ))
+    response.set_etag(etag)
+    # The page is per player and must be checked every time it's shown
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
+
+
+def player_summary(game):
+    player = game.player
+    return {
+        "seed": game.seed,
+        "name": player.name,
+        "level": player.level,
+        "xp": player.xp,
+        "total_fish": len(player.catch_record),
+    }
+
+
+def run_casts(state, positions):
+    """Cast to each position in turn and return the CastResults.
+
+    The leaderboard is written once at the end of the batch rather than once
+    per fish, and last_message follows the final cast so the HTML view stays
+    in step with API play.
+    """
+    game = state.game
+    before_catches = len(game.player.catch_record)
+    ensure_basic_setup(game)
+    results = [game.cast_web(position or None) for position in positions]
+    if results:
+        state.last_message = results[-1].message
+    if len(game.player.catch_record) > before_catches:
+        update_leaderboard(game.player)
+    return results
+
+
+@app.route("/api/cast", methods=["POST"])
+def api_cast():
+    """Cast once. Body: {"cast": "b3"}; omit cast for a random spot."""
+    data = request.get_json(silent=True) or {}
+    # Valid JSON that isn't an object (a list, a bare string) gets the same 400
+    if not isinstance(data, dict):
+        return jsonify(error="cast must be a string like 'b3'"), 400
+    position = data.get("cast")
+    if position is not None and not isinstance(position, str):
+        return jsonify(error="cast must be a string like 'b3'"), 400
+
+    state = current_session()
+    with state.lock:
+        (result,) = run_casts(state, [position])
+        state.notify()
+        return jsonify(result=result.to_dict(), player=player_summary(state.game))
+
+
+@app.route("/api/casts", methods=["POST"])
+def api_casts():
+    """Cast to every position in order. Body: {"casts": ["b3", "c4", ...]}."""
+    data = request.get_json(silent=True) or {}
+    positions = data.get("casts") if isinstance(data, dict) else None
+    if not isinstance(positions, list) or not all(
+        p is None or isinstance(p, str) for p in positions
+    ):
+        return jsonify(error="casts must be a list of positions like 'b3'"), 400
+    if len(positions) > MAX_BATCH_CASTS:
+        return jsonify(error=f"at most {MAX_BATCH_CASTS} casts per request"), 400
+
+    state = current_session()
+    with state.lock:
+        results = run_casts(state, positions)
+        state.notify()
+        return jsonify(
+            results=[r.to_dict() for r in results],
+            player=player_summary(state.game),
+        )
+
+
+@app.route("/api/stream", methods=["GET"])
+def api_stream():
+    """Server-sent events with the changes to this session's page (see live_view.py).
+
+    The first event carries the whole page state; after that each event
+    is sent when something changed, and holds only the changes.
+    """
+    state = current_session()
+
+    def events():
+        view = LiveView()
+        seen = None
+        idle_since = time.monotonic()
+        while True:
+            with state.lock:
+                # Changes announced while the last event was being sent don't wait
+                if seen == state.version:
+                    state.changed.wait(STREAM_POLL_SECONDS)
+                seen = state.version
+                delta = view.changes(state, leaderboard)
+            if delta:
+                idle_since = time.monotonic()
+                yield f"data: {json.dumps(delta)}\n\n"
+            elif time.monotonic() - idle_since >= STREAM_KEEPALIVE_SECONDS:
+                # Also how a closed connection gets noticed
+                idle_since = time.monotonic()
+                yield ": keep-alive\n\n"
+
+    return Response(
+        events(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
 
+@app.route("/api/replay", methods=["GET"])
+def api_replay():
+    """The session's seed and history, for replay.py."""
+    state = current_session()
+    with state.lock:
+        try:
+            return jsonify(export_record(state.game))
+        except ValueError as exc:
+            return jsonify(error=str(exc)), 409
+
+
+@app.route("/api/heatmap", methods=["GET"])
+def api_heatmap():
+    """Bite chance of a cast to each cell, null on land.
+
+    ?window=visible limits the grid to the cells display_game shows;
+    origin is the [row, col] of the grid's top-left cell.
+    """
+    state = current_session()
+    with state.lock:
+        game = state.game
+        ensure_basic_setup(game)
+        heatmap = game.bite_heatmap()
+        row0, col0 = 0, 0
+        if request.args.get("window") == "visible":
+            row0, row1, col0, col1 = game.visible_window()
+            heatmap = heatmap[row0:row1, col0:col1]
+        odds = game.odds()
+        grid = np.round(heatmap.astype(float), 4)
+        return jsonify(
+            location=game.current_location,
+            origin=[row0, col0],
+            bite_chance={"fish_nearby": odds.bite[True], "no_fish_nearby": odds.bite[False]},
+            grid=np.where(np.isnan(grid), None, grid).tolist(),
+        )
+
+
+@app.route("/metrics", methods=["GET"])
+def metrics_view():
+    """Latency histograms, cast counters and rates; set FFRPG_METRICS=1 to collect."""
+    if request.remote_addr not in METRICS_CLIENTS:
+        return jsonify(error="metrics are only served to local clients"), 403
+    return jsonify(metrics.snapshot())
+
+
 if __name__ == "__main__":
     # Run the Flask dev server
     app.run(debug=True)
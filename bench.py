@@ -0,0 +1,320 @@
+"""Micro-benchmarks for the engine hot paths and the Flask routes.
+
+Each benchmark is timed over enough loops to run for at least
+--min-time seconds, repeated --repeat times; the best per-call time is
+what gets reported and stored.
+
+    python bench.py                        # run everything and print a table
+    python bench.py --save baseline.json   # ...and store the results
+    python bench.py --compare baseline.json --threshold 1.25
+    python bench.py -k leaderboard --quick
+
+--compare exits non-zero if any benchmark got slower than the baseline by
+more than the threshold ratio.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable, Dict
+
+import numpy as np
+
+from main import FFRPG, LAND, Fly, FlyRod, Leader, Player, parse_position
+
+
+# name -> factory; a factory does its setup and returns the callable to time
+BENCHMARKS: Dict[str, Callable[[], Callable[[], object]]] = {}
+
+# Benchmarks skipped by --quick because their setup alone takes seconds
+SLOW = set()
+
+
+def benchmark(name: str, slow: bool = False):
+    def register(factory):
+        BENCHMARKS[name] = factory
+        if slow:
+            SLOW.add(name)
+        return factory
+    return register
+
+
+class _FixedRandom(random.Random):
+    """Random stream whose random() is pinned, to force a hit or miss path."""
+
+    def __init__(self, value: float):
+        super().__init__(0)
+        self.value = value
+
+    def random(self):
+        return self.value
+
+
+def _ready_game(grid_size: int = 10, location: str = "Mountain Stream") -> FFRPG:
+    game = FFRPG(grid_size, seed=1, record=False)
+    # Wall-clock fish movement would make timings depend on how long a run takes
+    game.fish_tick_seconds = None
+    game.current_rod = FlyRod(9, 5, "Graphite")
+    game.current_leader = Leader("Monofilament", "5X (3.0kg)", 9)
+    game.current_fly = Fly("Adams", "Dry Flies", 16)
+    game.generate_location("river")
+    game.current_location = location
+    return game
+
+
+def _water_cell(game: FFRPG) -> str:
+    for position in ("e5", "f5", "e6", "f6"):
+        row, col = parse_position(position)
+        if game.fishfinder_grid[row, col] != LAND:
+            return position
+    return "e5"
+
+
+for _location_type in ("river", "lake", "stream"):
+    for _size in (10, 500, 2000):
+        def _factory(location_type=_location_type, size=_size):
+            game = FFRPG(size, seed=1, record=False)
+            return lambda: game.generate_location(location_type)
+        benchmark(f"generate_location[{_location_type}-{_size}]", slow=_size >= 2000)(_factory)
+
+
+@benchmark("display_game[cached]")
+def _display_cached():
+    game = _ready_game()
+    game.display_game(as_string=True)
+    return lambda: game.display_game(as_string=True)
+
+
+@benchmark("display_game[after_cast]")
+def _display_after_cast():
+    game = _ready_game()
+    position = _water_cell(game)
+
+    def run():
+        game.start_fishing_web(position)
+        return game.display_game(as_string=True)
+    return run
+
+
+@benchmark("display_game[cold]")
+def _display_cold():
+    game = _ready_game()
+
+    def run():
+        game.renderer.invalidate()
+        return game.display_game(as_string=True)
+    return run
+
+
+@benchmark("start_fishing_web[miss]")
+def _cast_miss():
+    game = _ready_game()
+    game.rng = _FixedRandom(0.999)
+    position = _water_cell(game)
+    return lambda: game.start_fishing_web(position)
+
+
+@benchmark("start_fishing_web[hit]")
+def _cast_hit():
+    game = _ready_game()
+    game.rng = _FixedRandom(0.0)
+    position = _water_cell(game)
+    return lambda: game.start_fishing_web(position)
+
+
+@benchmark("FishSchool.step[12k fish]")
+def _fish_step():
+    game = _ready_game(400, "Alpine Lake")
+    game.generate_location("lake")
+    game.advance_fish(1)
+    school, grid = game._school, game.fishfinder_grid
+    rng = np.random.default_rng(1)
+    return lambda: school.step(grid, rng)
+
+
+@benchmark("advance_fish[400-1]")
+def _advance_fish():
+    game = _ready_game(400, "Alpine Lake")
+    game.generate_location("lake")
+    return lambda: game.advance_fish(1)
+
+
+@benchmark("Player.add_xp")
+def _add_xp():
+    player = Player("Bench", 0, 0)
+    return lambda: player.add_xp(10)
+
+
+def _leaderboard_factory(entries: int):
+    def factory():
+        app = _import_app()
+        from leaderboard import Leaderboard
+
+        path = os.path.join(_tmpdir(), f"leaderboard-{entries}.db")
+        if os.path.exists(path):
+            os.remove(path)
+        board = Leaderboard(path)
+        stamp = datetime.utcnow().isoformat() + "Z"
+        conn = board._connect()
+        with conn:
+            conn.execute("BEGIN")
+            conn.executemany(
+                "INSERT INTO leaderboard VALUES (?, ?, ?, ?, ?)",
+                ((f"angler{i}", i % 500, i % 30, i * 7 % 100000, stamp) for i in range(entries)),
+            )
+        app.leaderboard = board
+
+        player = Player("Bench", 0, 0)
+        player.add_catch("Brown Trout", 14)
+
+        def run():
+            player.xp += 1
+            app.update_leaderboard(player)
+        return run
+    return factory
+
+
+for _entries in (10, 10_000, 1_000_000):
+    benchmark(f"update_leaderboard[{_entries}]", slow=_entries >= 1_000_000)(_leaderboard_factory(_entries))
+
+
+@benchmark("flask[GET /]")
+def _flask_get():
+    client = _flask_client()
+    client.get("/")
+    return lambda: client.get("/")
+
+
+@benchmark("flask[POST cast]")
+def _flask_cast():
+    client = _flask_client()
+    client.get("/")
+    return lambda: client.post("/", data={"action": "cast", "cast": "e5"})
+
+
+_TMPDIR = None
+
+
+def _tmpdir() -> str:
+    global _TMPDIR
+    if _TMPDIR is None:
+        _TMPDIR = tempfile.mkdtemp(prefix="ffrpg-bench-")
+    return _TMPDIR
+
+
+def _import_app():
+    # Keep the benchmark away from the real leaderboard database
+    os.environ.setdefault("FFRPG_LEADERBOARD_DB", os.path.join(_tmpdir(), "app-leaderboard.db"))
+    import app
+    return app
+
+
+def _flask_client():
+    app = _import_app()
+    from leaderboard import Leaderboard
+
+    app.leaderboard = Leaderboard(os.path.join(_tmpdir(), "flask-leaderboard.db"))
+    return app.app.test_client()
+
+
+def time_benchmark(factory, min_time: float, repeat: int) -> Dict:
+    fn = factory()
+    # Calibrate the loop count so one repeat runs for at least min_time
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or loops >= 1 << 24:
+            break
+        loops *= 2 if elapsed == 0 else max(2, min(10, int(min_time / elapsed) + 1))
+
+    per_call = [elapsed / loops]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        per_call.append((time.perf_counter() - start) / loops)
+    per_call.sort()
+    return {
+        "best_us": per_call[0] * 1e6,
+        "median_us": per_call[len(per_call) // 2] * 1e6,
+        "loops": loops,
+        "repeat": repeat,
+    }
+
+
+def compare(results: Dict, baseline: Dict, threshold: float) -> bool:
+    """Print a comparison table; return True if nothing regressed."""
+    ok = True
+    print(f"\n{'benchmark':<36} {'baseline':>12} {'current':>12} {'ratio':>7}")
+    for name, current in results.items():
+        old = baseline["results"].get(name)
+        if old is None:
+            print(f"{name:<36} {'-':>12} {current['best_us']:>10.2f}us {'new':>7}")
+            continue
+        ratio = current["best_us"] / old["best_us"] if old["best_us"] else float("inf")
+        flag = ""
+        if ratio > threshold:
+            flag = "  REGRESSION"
+            ok = False
+        elif ratio < 1 / threshold:
+            flag = "  faster"
+        print(f"{name:<36} {old['best_us']:>10.2f}us {current['best_us']:>10.2f}us {ratio:>7.2f}{flag}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FFRPG benchmark suite")
+    parser.add_argument("-k", dest="filter", default="", help="only run benchmarks whose name contains this")
+    parser.add_argument("--quick", action="store_true", help="skip benchmarks with multi-second setup")
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds per repeat")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--save", metavar="FILE", help="write results as a JSON baseline")
+    parser.add_argument("--compare", metavar="FILE", help="compare against a saved baseline")
+    parser.add_argument("--threshold", type=float, default=1.25, help="slowdown ratio counted as a regression")
+    parser.add_argument("--list", action="store_true")
+    args = parser.parse_args()
+
+    names = [
+        name for name in BENCHMARKS
+        if args.filter in name and not (args.quick and name in SLOW)
+    ]
+    if args.list:
+        print("\n".join(names))
+        return
+
+    results = {}
+    for name in names:
+        # add_xp and the Flask routes print level-ups; keep the table readable
+        with contextlib.redirect_stdout(io.StringIO()):
+            results[name] = time_benchmark(BENCHMARKS[name], args.min_time, args.repeat)
+        r = results[name]
+        print(f"{name:<36} {r['best_us']:>12.2f}us  (median {r['median_us']:.2f}us, {r['loops']} loops)")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({
+                "created": datetime.utcnow().isoformat() + "Z",
+                "python": sys.version.split()[0],
+                "platform": platform.platform(),
+                "results": results,
+            }, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if not compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Compact, append-only record of a player's catches.
+
+Species names are interned into small integer IDs shared by every log in
+the process, and each catch is stored as two machine integers in
+array-backed columns instead of a (str, int) tuple. Totals, the best size,
+and per-species counts and bests are updated on every append, so the
+leaderboard and stats views never scan the log.
+
+IDs are only meaningful inside one process; to_list() and from_pairs()
+use species names, so saved games don't depend on them.
+"""
+from array import array
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+# Process-wide intern table: id -> name and name -> id
+SPECIES_NAMES: List[str] = []
+_SPECIES_IDS: Dict[str, int] = {}
+
+
+def species_id(name: str) -> int:
+    """Return the interned ID of a species name, assigning one if it's new."""
+    sid = _SPECIES_IDS.get(name)
+    if sid is None:
+        sid = _SPECIES_IDS[name] = len(SPECIES_NAMES)
+        SPECIES_NAMES.append(name)
+    return sid
+
+
+class CatchLog:
+    def __init__(self):
+        self.species_ids = array("H")
+        self.sizes = array("H")
+        self.best_size = 0
+        # species id -> [count, best size]
+        self._by_species: Dict[int, List[int]] = {}
+
+    @classmethod
+    def from_pairs(cls, pairs: Iterable) -> "CatchLog":
+        """Build a log from (species, size) pairs, e.g. an old JSON save."""
+        log = cls()
+        for species, size in pairs:
+            log.append(species, size)
+        return log
+
+    @classmethod
+    def from_columns(cls, species_ids: array, sizes: array) -> "CatchLog":
+        """Adopt ready-made 'H' columns (e.g. from a save file) and total them up."""
+        log = cls()
+        log.species_ids = species_ids
+        log.sizes = sizes
+        for sid, size in zip(species_ids, sizes):
+            log._count(sid, size)
+        return log
+
+    def append(self, species: str, size: int) -> None:
+        sid = species_id(species)
+        self.species_ids.append(sid)
+        self.sizes.append(size)
+        self._count(sid, size)
+
+    def _count(self, sid: int, size: int) -> None:
+        if size > self.best_size:
+            self.best_size = size
+        stats = self._by_species.get(sid)
+        if stats is None:
+            self._by_species[sid] = [1, size]
+        else:
+            stats[0] += 1
+            if size > stats[1]:
+                stats[1] = size
+
+    def __len__(self) -> int:
+        return len(self.sizes)
+
+    def __getitem__(self, index: int) -> Tuple[str, int]:
+        return SPECIES_NAMES[self.species_ids[index]], self.sizes[index]
+
+    def __iter__(self) -> Iterator[Tuple[str, int]]:
+        names = SPECIES_NAMES
+        for sid, size in zip(self.species_ids, self.sizes):
+            yield names[sid], size
+
+    def species_stats(self) -> Dict[str, Tuple[int, int]]:
+        """species -> (count, best size), in order of first catch."""
+        return {SPECIES_NAMES[sid]: (count, best) for sid, (count, best) in self._by_species.items()}
+
+    def to_list(self) -> List[List]:
+        """[[species, size], ...] for JSON saves."""
+        return [[species, size] for species, size in self]
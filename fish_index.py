@@ -0,0 +1,60 @@
+"""Spatial index over the fish layer of a location.
+
+FishIndex keeps a summed-area table of fish positions, so both "is there a
+fish within r cells" and "how many fish within r cells" take four table
+lookups whatever the radius or map size. Catching or adding a fish updates
+the table in place with one vectorized slice operation. A fish tick moves
+too many fish for that, so the game drops the index after a tick and
+builds a new one from the grid the next time it needs the whole table;
+single lookups in between count the grid window directly.
+"""
+import numpy as np
+
+
+class FishIndex:
+    def __init__(self, fish_mask: np.ndarray):
+        rows, cols = fish_mask.shape
+        self.shape = (rows, cols)
+        # _sat[y, x] is the number of fish in fish_mask[:y, :x]
+        self._sat = np.zeros((rows + 1, cols + 1), dtype=np.int32)
+        np.cumsum(np.cumsum(fish_mask, axis=0, dtype=np.int32), axis=1, out=self._sat[1:, 1:])
+
+    def __len__(self):
+        return int(self._sat[-1, -1])
+
+    def count_within(self, row: int, col: int, radius: int = 1) -> int:
+        """Number of fish in the square of cells within radius of (row, col)."""
+        rows, cols = self.shape
+        top = max(row - radius, 0)
+        left = max(col - radius, 0)
+        bottom = min(row + radius + 1, rows)
+        right = min(col + radius + 1, cols)
+        if top >= bottom or left >= right:
+            return 0
+        sat = self._sat
+        return int(sat[bottom, right] - sat[top, right] - sat[bottom, left] + sat[top, left])
+
+    def any_within(self, row: int, col: int, radius: int = 1) -> bool:
+        return self.count_within(row, col, radius) > 0
+
+    def count_grid(self, radius: int = 1) -> np.ndarray:
+        """count_within for every cell at once, as an array shaped like the map.
+
+        This is the fish layer convolved with a (2r+1)-square box. Padding the
+        table by its edge values clamps the box at the borders, so the four
+        corners of every box are plain shifted slices.
+        """
+        rows, cols = self.shape
+        r = radius
+        padded = np.pad(self._sat, r, mode="edge")
+        top, bottom = slice(0, rows), slice(2 * r + 1, 2 * r + 1 + rows)
+        left, right = slice(0, cols), slice(2 * r + 1, 2 * r + 1 + cols)
+        return padded[bottom, right] - padded[top, right] - padded[bottom, left] + padded[top, left]
+
+    def add(self, row: int, col: int) -> None:
+        """Record a fish placed at (row, col); the caller updates the grid."""
+        self._sat[row + 1:, col + 1:] += 1
+
+    def remove(self, row: int, col: int) -> None:
+        """Record a fish removed from (row, col); the caller updates the grid."""
+        self._sat[row + 1:, col + 1:] -= 1
@@ -0,0 +1,100 @@
+"""Session-keyed store of live games for the web edition.
+
+Each browser session gets its own FFRPG instance. The store keeps at most
+``max_games`` of them resident, evicting the least recently used first and
+dropping any that have been idle for longer than ``idle_ttl`` seconds.
+
+The store-wide lock only guards the bookkeeping dict, so it is held for a
+handful of dict operations. Work on a game happens under that game's own
+lock, which means requests from different players never wait on each other.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from main import FFRPG
+
+
+WELCOME_MESSAGE = "Welcome to FFRPG (web lofi edition). Use the controls below to play."
+
+
+class GameSession:
+    """One player's game plus the per-session state the web UI shows."""
+
+    def __init__(self, game: FFRPG, last_message: str = WELCOME_MESSAGE):
+        self.game = game
+        self.last_message = last_message
+        self.lock = threading.RLock()
+        # Counts the changes announced through notify(); event streams wait on changed for the next one
+        self.version = 0
+        self.changed = threading.Condition(self.lock)
+        # The page's leaderboard panel and the (board change_key, player name) it was built from
+        self.board_text = None
+        self.board_key = None
+        self.last_seen = time.monotonic()
+
+    def notify(self) -> None:
+        """Wake the session's event streams; call with lock held, after a change."""
+        self.version += 1
+        self.changed.notify_all()
+
+
+class GameStore:
+    def __init__(self, max_games: int = 5000, idle_ttl: float = 3600.0, factory=FFRPG):
+        if max_games < 1:
+            raise ValueError("max_games must be at least 1")
+        self.max_games = max_games
+        self.idle_ttl = idle_ttl
+        self.factory = factory
+        self._sessions: "OrderedDict[str, GameSession]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._sessions)
+
+    def __contains__(self, session_id):
+        with self._lock:
+            return session_id in self._sessions
+
+    def get(self, session_id: str) -> GameSession:
+        """Return the session for session_id, creating a fresh game if needed."""
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            entry = self._sessions.get(session_id)
+            if entry is not None:
+                self._sessions.move_to_end(session_id)
+                entry.last_seen = now
+                return entry
+
+        # Build the new game outside the store lock; generating a location
+        # can be slow and nobody else can see this session yet anyway.
+        created = GameSession(self.factory())
+        with self._lock:
+            entry = self._sessions.setdefault(session_id, created)
+            self._sessions.move_to_end(session_id)
+            entry.last_seen = now
+            while len(self._sessions) > self.max_games:
+                self._sessions.popitem(last=False)
+        return entry
+
+    def discard(self, session_id: str) -> None:
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def evict_expired(self) -> int:
+        """Drop idle sessions now and return how many were removed."""
+        with self._lock:
+            return self._expire(time.monotonic())
+
+    def _expire(self, now: float) -> int:
+        # Entries are kept in access order, so idle ones are always at the front
+        removed = 0
+        while self._sessions:
+            entry = next(iter(self._sessions.values()))
+            if now - entry.last_seen <= self.idle_ttl:
+                break
+            self._sessions.popitem(last=False)
+            removed += 1
+        return removed
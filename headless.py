@@ -0,0 +1,179 @@
+"""Scripted, headless runs of the console game.
+
+A script is the text a player would type into FFRPG.main_menu, one answer
+per line: menu choices, build options, cast positions. Blank lines and
+lines starting with '#' are skipped. Prompts whose answer the script
+can't know in advance are answered by the driver: "Press Enter" prompts,
+and the fight prompts, which only appear when a fish bites. A session
+ends when the script quits through the menu or runs out of lines.
+
+    # leader, rod and fly with the first option everywhere, then the lake
+    1
+    1
+    1
+    7
+    2
+    1
+    1
+    1
+    3
+    1
+    1
+    1
+    4
+    3
+    5
+    b3
+    5
+    c4
+    9
+    y
+
+--turbo drops the pause on every cast and the "Press Enter" prompts, so
+a session runs in about a millisecond:
+
+    python headless.py session.txt --turbo --sessions 10000
+    some-generator | python headless.py - --turbo
+
+Fish stay put unless --fish-tick is given, so a seed always replays the
+same session. Saves go to a scratch directory unless --save-dir says
+otherwise.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from typing import Dict, Iterable, List
+
+from main import FFRPG, SAVE_JOURNAL, SAVE_MAP
+from map_codec import MAX_SEED
+from save_journal import SaveJournal
+
+
+FIGHT_PROMPT = "Choose your action"
+# start_fishing's prompt for the cast position
+CAST_PROMPT = "> "
+FIGHT_ACTIONS = ("1", "2", "3")
+
+
+def read_script(lines: Iterable[str]) -> List[str]:
+    answers = []
+    for line in lines:
+        line = line.rstrip("\n")
+        if line.strip() and not line.lstrip().startswith("#"):
+            answers.append(line.strip())
+    return answers
+
+
+class ScriptedInput:
+    """Stands in for input(): returns the script's answers in order.
+
+    Raises EOFError once the script is used up, as input() does at the
+    end of stdin. The prompt and answer are printed like a terminal echo.
+    casts counts the answers given to the cast prompt.
+    """
+
+    def __init__(self, answers: List[str], fight: str = "random", rng: random.Random | None = None):
+        self._answers = iter(answers)
+        self.fight = fight
+        self.rng = rng or random.Random()
+        self.casts = 0
+
+    def __call__(self, prompt: str = "") -> str:
+        if prompt.lstrip().startswith(FIGHT_PROMPT):
+            answer = self.rng.choice(FIGHT_ACTIONS) if self.fight == "random" else self.fight
+        elif "Press Enter" in prompt:
+            answer = ""
+        else:
+            answer = next(self._answers, None)
+            if answer is None:
+                raise EOFError("end of script")
+            if prompt == CAST_PROMPT:
+                self.casts += 1
+        print(prompt + answer)
+        return answer
+
+
+def run_session(answers: List[str], seed: int | None = None, turbo: bool = True, grid_size: int = 10,
+                fight: str = "random", fish_tick_seconds: float | None = None) -> FFRPG:
+    """Play one console session from answers and return the finished game.
+
+    Console output goes wherever stdout points; the caller redirects it.
+    """
+    game = FFRPG(grid_size, seed=seed)
+    game.input = ScriptedInput(answers, fight, random.Random(game.seed))
+    game.turbo = turbo
+    game.fish_tick_seconds = fish_tick_seconds
+    # Nobody is relying on a soak run's saves surviving a crash
+    game.journal = SaveJournal(SAVE_JOURNAL, durable=not turbo, map_path=SAVE_MAP)
+    try:
+        game.main_menu()
+    except EOFError:
+        pass
+    return game
+
+
+def run_sessions(answers: List[str], sessions: int, seed: int | None = None, show: bool = False,
+                 **options) -> Dict:
+    """Run the script `sessions` times (session i gets seed + i) and total them up."""
+    totals = {"sessions": sessions, "casts": 0, "fish": 0, "xp": 0}
+    start = time.perf_counter()
+    with open(os.devnull, "w") as devnull, redirect_stdout(sys.stdout if show else devnull):
+        for i in range(sessions):
+            game = run_session(answers, None if seed is None else seed + i, **options)
+            # Loading a save drops the history, so the input counts the casts
+            totals["casts"] += game.input.casts
+            totals["fish"] += len(game.player.catch_record)
+            totals["xp"] += game.player.xp
+    elapsed = time.perf_counter() - start
+    totals["seconds"] = elapsed
+    totals["sessions_per_minute"] = sessions / elapsed * 60 if elapsed else 0.0
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run scripted console sessions of FFRPG")
+    parser.add_argument("script", help="file of answers, one per line, or - for stdin")
+    parser.add_argument("--sessions", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=None, help="seed of the first session")
+    parser.add_argument("--turbo", action="store_true", help="skip cast pauses and Enter prompts")
+    parser.add_argument("--fight", default="random", choices=["random", *FIGHT_ACTIONS],
+                        help="answer to every fight prompt")
+    parser.add_argument("--fish-tick", type=float, default=None, help="seconds per fish move; default frozen")
+    parser.add_argument("--grid-size", type=int, default=10)
+    parser.add_argument("--save-dir", default=None, help="where saves go; default a scratch directory")
+    parser.add_argument("--show", action="store_true", help="print the console output")
+    parser.add_argument("--json", action="store_true", help="print the totals as JSON")
+    args = parser.parse_args()
+    if args.seed is not None and not 0 <= args.seed <= MAX_SEED - max(args.sessions - 1, 0):
+        parser.error(f"--seed plus the session count must stay within 0..{MAX_SEED}")
+
+    if args.script == "-":
+        answers = read_script(sys.stdin)
+    else:
+        with open(args.script) as f:
+            answers = read_script(f)
+    if args.save_dir:
+        os.makedirs(args.save_dir, exist_ok=True)
+    os.chdir(args.save_dir or tempfile.mkdtemp(prefix="ffrpg-headless-"))
+
+    totals = run_sessions(
+        answers, args.sessions, args.seed, args.show,
+        turbo=args.turbo, grid_size=args.grid_size, fight=args.fight, fish_tick_seconds=args.fish_tick,
+    )
+    if args.json:
+        print(json.dumps(totals, indent=2))
+    else:
+        print(
+            f"{totals['sessions']} sessions in {totals['seconds']:.2f}s "
+            f"({totals['sessions_per_minute']:.0f}/min): "
+            f"{totals['casts']} casts, {totals['fish']} fish, {totals['xp']} xp"
+        )
+
+
+if __name__ == "__main__":
+    main()
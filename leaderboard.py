@@ -0,0 +1,168 @@
+"""SQLite-backed leaderboard for the web edition.
+
+Entries live in a single table keyed by player name, with an index on the
+ranking columns (total fish, then best size, then XP). Recording a catch is
+one indexed upsert and the top-N view is an index scan, so neither has to
+touch the rest of the board. The database runs in WAL mode so readers never
+block the writer.
+"""
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, List
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS leaderboard (
+    name TEXT PRIMARY KEY,
+    total_fish INTEGER NOT NULL,
+    best_size INTEGER NOT NULL,
+    xp INTEGER NOT NULL,
+    last_updated TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS leaderboard_rank
+    ON leaderboard (total_fish DESC, best_size DESC, xp DESC);
+"""
+
+COLUMNS = ("name", "total_fish", "best_size", "xp", "last_updated")
+
+
+def format_board(entries: List[Dict], player_name: str | None = None, player_rank: int | None = None) -> str:
+    """The text of the web page's leaderboard panel."""
+    lines = ["Name                 Fish  Best  XP", "-" * 36]
+    if entries:
+        lines += [
+            f"{e['name']:<18}  {e['total_fish']:3d}   {e['best_size']:3d}  {e['xp']:5d}" for e in entries
+        ]
+    else:
+        lines.append("(no records yet)")
+    if player_rank:
+        lines.append(f"{player_name} is ranked #{player_rank}")
+    return "\n".join(lines)
+
+
+class Leaderboard:
+    def __init__(self, path: str = "leaderboard.db", import_json: str | None = None):
+        self.path = path
+        # sqlite3 connections can't be shared between threads, so each
+        # request thread lazily opens its own
+        self._local = threading.local()
+        # Bumped by every write made through this object, so views can tell when to re-read
+        self.version = 0
+        # Only asked for PRAGMA data_version, which changes when any other
+        # connection commits: another thread's, another process's or another tool's
+        self._watch = sqlite3.connect(self.path, timeout=10, isolation_level=None, check_same_thread=False)
+        self._watch_lock = threading.Lock()
+        conn = self._connect()
+        conn.executescript(SCHEMA)
+        if import_json and self._is_empty():
+            self.import_json(import_json)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def change_key(self) -> tuple:
+        """A value that changes whenever the board may have, whoever wrote to it.
+
+        (version, data_version): writes through this object bump version,
+        and the watch connection's data_version moves on a commit from any
+        other connection, in this process or not.
+        """
+        with self._watch_lock:
+            (data_version,) = self._watch.execute("PRAGMA data_version").fetchone()
+        return self.version, data_version
+
+    def _is_empty(self) -> bool:
+        return self._connect().execute("SELECT 1 FROM leaderboard LIMIT 1").fetchone() is None
+
+    def __len__(self):
+        return self._connect().execute("SELECT COUNT(*) FROM leaderboard").fetchone()[0]
+
+    def record(self, name: str, total_fish: int, best_size: int, xp: int) -> None:
+        """Insert or update the entry for name."""
+        self._connect().execute(
+            """
+            INSERT INTO leaderboard (name, total_fish, best_size, xp, last_updated)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(name) DO UPDATE SET
+                total_fish = excluded.total_fish,
+                best_size = excluded.best_size,
+                xp = excluded.xp,
+                last_updated = excluded.last_updated
+            """,
+            (name, total_fish, best_size, xp, datetime.utcnow().isoformat() + "Z"),
+        )
+        self.version += 1
+
+    def top(self, limit: int = 10) -> List[Dict]:
+        rows = self._connect().execute(
+            f"SELECT {', '.join(COLUMNS)} FROM leaderboard "
+            "ORDER BY total_fish DESC, best_size DESC, xp DESC LIMIT ?",
+            (limit,),
+        ).fetchall()
+        return [dict(zip(COLUMNS, row)) for row in rows]
+
+    def get(self, name: str) -> Dict | None:
+        row = self._connect().execute(
+            f"SELECT {', '.join(COLUMNS)} FROM leaderboard WHERE name = ?", (name,)
+        ).fetchone()
+        return dict(zip(COLUMNS, row)) if row else None
+
+    def rank(self, name: str) -> int | None:
+        """Return the 1-based rank of name, or None if they have no entry.
+
+        Players with identical totals share a rank.
+        """
+        conn = self._connect()
+        row = conn.execute(
+            "SELECT total_fish, best_size, xp FROM leaderboard WHERE name = ?", (name,)
+        ).fetchone()
+        if row is None:
+            return None
+        ahead = conn.execute(
+            "SELECT COUNT(*) FROM leaderboard WHERE (total_fish, best_size, xp) > (?, ?, ?)",
+            row,
+        ).fetchone()[0]
+        return ahead + 1
+
+    def import_json(self, json_path: str) -> int:
+        """Load entries from the old leaderboard.json format."""
+        if not os.path.exists(json_path):
+            return 0
+        try:
+            with open(json_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return 0
+        if not isinstance(data, list):
+            return 0
+
+        rows = [
+            (
+                e.get("name"),
+                e.get("total_fish", 0),
+                e.get("best_size", 0),
+                e.get("xp", 0),
+                e.get("last_updated") or datetime.utcnow().isoformat() + "Z",
+            )
+            for e in data
+            if isinstance(e, dict) and e.get("name")
+        ]
+        conn = self._connect()
+        with conn:
+            conn.execute("BEGIN")
+            conn.executemany(
+                "INSERT OR REPLACE INTO leaderboard (name, total_fish, best_size, xp, last_updated) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+        self.version += 1
+        return len(rows)
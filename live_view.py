@@ -0,0 +1,59 @@
+"""Changes to a session's web page, for the /api/stream event stream.
+
+A LiveView remembers what one open page is showing: the display_game
+frame, the message, the player's name (in the name box) and the
+leaderboard panel. Level, XP and rank aren't sent separately, since the
+frame's header and the panel already show them. changes() returns only
+what differs from that. The frame goes as spans of changed characters
+(see terminal.line_changes), so a cast typically sends a few hundred
+bytes instead of a re-rendered page.
+
+The first call returns everything, because the page may have changed
+between being rendered and opening its stream.
+"""
+from typing import Dict
+
+from leaderboard import Leaderboard, format_board
+from terminal import line_changes
+
+# Entries shown in the leaderboard panel
+BOARD_SIZE = 10
+
+
+class LiveView:
+    def __init__(self):
+        self.lines = None
+        self.message = None
+        self.name = None
+        self.board = None
+        self._board_key = None
+
+    def changes(self, state, leaderboard: Leaderboard) -> Dict:
+        """What changed in state since the last call; an empty dict if nothing did."""
+        game = state.game
+        delta = {}
+
+        lines = game.display_game(as_string=True).split("\n")
+        if self.lines is None or len(lines) != len(self.lines):
+            delta["display"] = "\n".join(lines)
+        else:
+            spans = [list(change) for change in line_changes(self.lines, lines)]
+            if spans:
+                delta["spans"] = spans
+        self.lines = lines
+
+        if state.last_message != self.message:
+            delta["message"] = self.message = state.last_message
+
+        name = game.player.name
+        if name != self.name:
+            delta["name"] = self.name = name
+
+        # The board only needs reading again after a write or a rename
+        key = (leaderboard.change_key(), name)
+        if key != self._board_key:
+            self._board_key = key
+            board = format_board(leaderboard.top(BOARD_SIZE), name, leaderboard.rank(name))
+            if board != self.board:
+                delta["leaderboard"] = self.board = board
+        return delta
@@ -0,0 +1,373 @@
+"""Load generator for the web edition.
+
+Simulates --anglers concurrent players against app.py. Each virtual angler
+keeps its own session cookie and does what a new player does in the
+browser: set a name, build a rod, leader and fly, and pick a location, then
+cast in a loop, loading the page after each cast as the browser follows
+the redirect. Between requests it waits a random think time (exponential,
+mean --think seconds).
+
+    python loadgen.py --anglers 50 --duration 30                # in-process, Flask test client
+    python loadgen.py --url http://127.0.0.1:5000 --anglers 20 --think 0.5
+
+The report gives throughput, then count, error rate and p50/p95/p99/max
+latency for each action. It also gives the server's leaderboard write
+timings, and the share of cast time they take, which shows whether
+casts are queueing on the leaderboard database. In-process runs turn
+metrics on and use a scratch leaderboard database. Against a live server,
+run it with FFRPG_METRICS=1 for the leaderboard figures; they come from
+its /metrics view, so loadgen has to run on the same machine.
+"""
+import argparse
+import http.client
+import json
+import math
+import os
+import random
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List
+from urllib.parse import urlencode, urlsplit
+
+from main import (
+    FLY_SIZES,
+    LEADER_DIAMETERS,
+    LEADER_LENGTHS,
+    LEADER_LINE_TYPES,
+    LOCATIONS,
+    PATTERN_TO_CATEGORY,
+    ROD_LENGTHS,
+    ROD_MATERIALS,
+    ROD_WEIGHTS,
+    column_label,
+)
+from metrics import BUCKET_BOUNDS, perf_counter
+
+
+PERCENTILES = (50, 95, 99)
+
+
+class TestClientTransport:
+    """Requests through Flask's test client, in this process."""
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method: str, path: str, form: Dict | None = None, body: Dict | None = None) -> int:
+        return self.client.open(path, method=method, data=form, json=body).status_code
+
+
+class HttpTransport:
+    """Requests to a live server over one keep-alive connection, carrying the session cookie."""
+
+    def __init__(self, url: str):
+        parts = urlsplit(url)
+        self.host = parts.hostname or "127.0.0.1"
+        self.port = parts.port or 80
+        self.prefix = parts.path.rstrip("/")
+        self.cookie = None
+        self._conn = None
+
+    def request(self, method: str, path: str, form: Dict | None = None, body: Dict | None = None) -> int:
+        return self.fetch(method, path, form, body)[0]
+
+    def fetch(self, method: str, path: str, form: Dict | None = None, body: Dict | None = None) -> tuple:
+        """Make one request and return (status, response body)."""
+        headers = {}
+        data = None
+        if form is not None:
+            data = urlencode(form)
+            headers["Content-Type"] = "application/x-www-form-urlencoded"
+        elif body is not None:
+            data = json.dumps(body)
+            headers["Content-Type"] = "application/json"
+        if self.cookie:
+            headers["Cookie"] = self.cookie
+
+        reused = self._conn is not None
+        if not reused:
+            self._conn = http.client.HTTPConnection(self.host, self.port, timeout=30)
+        try:
+            self._conn.request(method, self.prefix + path, data, headers)
+            response = self._conn.getresponse()
+            content = response.read()
+        except (http.client.HTTPException, OSError):
+            self.close()
+            if not reused:
+                raise
+            # The server dropped an idle keep-alive connection; try once on a new one
+            return self.fetch(method, path, form, body)
+
+        cookie = response.getheader("Set-Cookie")
+        if cookie:
+            self.cookie = cookie.split(";", 1)[0]
+        if response.will_close:
+            self.close()
+        return response.status, content
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+class Angler:
+    """One virtual player; its latencies and errors are its own, so threads never share them."""
+
+    def __init__(self, name: str, transport, rng: random.Random, think: float, grid_size: int,
+                 api: bool = False):
+        self.name = name
+        self.transport = transport
+        self.rng = rng
+        self.think = think
+        self.grid_size = grid_size
+        self.api = api
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.casts = 0
+
+    def _call(self, action: str, method: str, path: str, **kwargs) -> None:
+        start = perf_counter()
+        try:
+            failed = self.transport.request(method, path, **kwargs) >= 400
+        except (http.client.HTTPException, OSError):
+            failed = True
+        self.latencies[action].append(perf_counter() - start)
+        if failed:
+            self.errors[action] += 1
+
+    def _pause(self) -> None:
+        if self.think > 0:
+            time.sleep(self.rng.expovariate(1 / self.think))
+
+    def _post(self, action: str, **fields) -> None:
+        self._call(action, "POST", "/", form={"action": action, **fields})
+        self._pause()
+
+    def setup(self) -> None:
+        choice = self.rng.choice
+        self._post("set_name", player_name=self.name)
+        self._post("build_rod", rod_length=choice(ROD_LENGTHS), rod_weight=choice(ROD_WEIGHTS),
+                   rod_material=choice(ROD_MATERIALS))
+        self._post("build_leader", leader_material=choice(LEADER_LINE_TYPES),
+                   leader_tippet=choice(LEADER_DIAMETERS), leader_length=choice(LEADER_LENGTHS))
+        self._post("build_fly", fly_pattern=choice(list(PATTERN_TO_CATEGORY)), fly_size=choice(FLY_SIZES))
+        self._post("location", location=choice(LOCATIONS))
+
+    def cast(self) -> None:
+        row = self.rng.randrange(self.grid_size)
+        position = f"{column_label(self.rng.randrange(self.grid_size))}{row + 1}"
+        if self.api:
+            self._call("api_cast", "POST", "/api/cast", body={"cast": position})
+        else:
+            self._call("cast", "POST", "/", form={"action": "cast", "cast": position})
+            self._call("view", "GET", "/")
+        self.casts += 1
+        self._pause()
+
+    def run(self, deadline: float, max_casts: int | None = None) -> None:
+        self.setup()
+        while time.monotonic() < deadline and (max_casts is None or self.casts < max_casts):
+            self.cast()
+
+
+def _percentile(ordered: List[float], q: float) -> float:
+    # Nearest-rank percentile of an already sorted list
+    return ordered[max(math.ceil(q / 100 * len(ordered)), 1) - 1]
+
+
+def _bucket_text(bound_ms: float | None) -> str:
+    if bound_ms is None:
+        return f"> {BUCKET_BOUNDS[-1] * 1000:.0f} ms"
+    return f"<= {bound_ms:.3f} ms"
+
+
+def _histograms(snapshot: Dict | None) -> Dict:
+    return (snapshot or {}).get("histograms", {})
+
+
+def _histogram_delta(before: Dict | None, after: Dict | None) -> Dict | None:
+    """What a metrics histogram snapshot gained between two snapshots, with bucket percentiles."""
+    if not after:
+        return None
+    counts = {bound: count for bound, count in after["buckets"]}
+    for bound, count in (before or {}).get("buckets", []):
+        counts[bound] -= count
+    total = sum(counts.values())
+    if not total:
+        return None
+    result = {"count": total, "sum_ms": after["sum_ms"] - (before or {}).get("sum_ms", 0.0)}
+    # The overflow bucket's bound is None; it sorts last and its percentiles stay None
+    ordered = sorted(counts.items(), key=lambda item: (item[0] is None, item[0] or 0.0))
+    for q in PERCENTILES:
+        seen = 0
+        for bound, count in ordered:
+            seen += count
+            if seen >= q / 100 * total:
+                result[f"p{q}_ms"] = bound
+                break
+    return result
+
+
+class LoadReport:
+    """Latencies and errors of every angler, merged, plus the server's view of the run."""
+
+    def __init__(self, anglers: List[Angler], seconds: float, server_before: Dict | None,
+                 server_after: Dict | None):
+        self.anglers = len(anglers)
+        self.seconds = seconds
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        for angler in anglers:
+            for action, values in angler.latencies.items():
+                self.latencies[action].extend(values)
+            for action, count in angler.errors.items():
+                self.errors[action] += count
+        self.casts = sum(angler.casts for angler in anglers)
+        self.requests = sum(len(values) for values in self.latencies.values())
+        self.server_enabled = bool(server_after and server_after.get("enabled"))
+        before, after = _histograms(server_before), _histograms(server_after)
+        self.leaderboard = _histogram_delta(before.get("leaderboard.write"), after.get("leaderboard.write"))
+        # Route timings are named "route.<method> <rule>[ <form action>]"
+        cast_ms = 0.0
+        for name, histogram in after.items():
+            if name.startswith("route.") and (name.endswith(" cast") or name.endswith("/api/cast")):
+                delta = _histogram_delta(before.get(name), histogram)
+                cast_ms += delta["sum_ms"] if delta else 0.0
+        self.cast_server_ms = cast_ms
+
+    def actions(self) -> Dict[str, Dict]:
+        out = {}
+        for action, values in self.latencies.items():
+            ordered = sorted(values)
+            stats = {
+                "count": len(ordered),
+                "errors": self.errors.get(action, 0),
+                "error_rate": self.errors.get(action, 0) / len(ordered),
+            }
+            for q in PERCENTILES:
+                stats[f"p{q}_ms"] = _percentile(ordered, q) * 1000
+            stats["max_ms"] = ordered[-1] * 1000
+            out[action] = stats
+        return out
+
+    def to_dict(self) -> Dict:
+        return {
+            "anglers": self.anglers,
+            "seconds": self.seconds,
+            "requests": self.requests,
+            "requests_per_second": self.requests / self.seconds,
+            "casts": self.casts,
+            "casts_per_second": self.casts / self.seconds,
+            "actions": self.actions(),
+            "leaderboard_write": self.leaderboard,
+            "leaderboard_share_of_cast_time": (
+                self.leaderboard["sum_ms"] / self.cast_server_ms
+                if self.leaderboard and self.cast_server_ms else None
+            ),
+        }
+
+    def __str__(self) -> str:
+        report = self.to_dict()
+        lines = [
+            f"{self.anglers} anglers for {self.seconds:.1f}s: "
+            f"{self.requests} requests ({report['requests_per_second']:.1f}/s), "
+            f"{self.casts} casts ({report['casts_per_second']:.1f}/s)",
+            "",
+            f"{'action':<14}{'count':>8}{'errors':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}",
+        ]
+        for action, stats in sorted(report["actions"].items()):
+            lines.append(
+                f"{action:<14}{stats['count']:>8}{stats['error_rate']:>8.1%} "
+                f"{stats['p50_ms']:>9.2f}{stats['p95_ms']:>10.2f}{stats['p99_ms']:>10.2f}{stats['max_ms']:>10.2f}"
+            )
+        lines.append("")
+        writes = self.leaderboard
+        if writes:
+            share = report["leaderboard_share_of_cast_time"]
+            lines.append(
+                f"leaderboard writes: {writes['count']}, {writes['sum_ms']:.1f} ms in total, "
+                f"p50 {_bucket_text(writes['p50_ms'])}, p95 {_bucket_text(writes['p95_ms'])}, "
+                f"p99 {_bucket_text(writes['p99_ms'])}"
+                + (f"; {share:.1%} of server time in casts" if share is not None else "")
+            )
+        elif self.server_enabled:
+            lines.append("leaderboard writes: none (no fish landed)")
+        else:
+            lines.append("leaderboard writes: unknown (server metrics are off; set FFRPG_METRICS=1)")
+        return "\n".join(lines)
+
+
+def run_load(transports: List, duration: float, think: float = 0.0, grid_size: int = 10,
+             max_casts: int | None = None, api: bool = False, seed: int | None = None,
+             server_metrics=None) -> LoadReport:
+    """Run one angler per transport on its own thread for `duration` seconds.
+
+    server_metrics, if given, returns a metrics snapshot; it's called
+    before and after the run.
+    """
+    rng = random.Random(seed)
+    run_tag = f"{rng.getrandbits(24):06x}"
+    anglers = [
+        Angler(f"angler-{run_tag}-{i:04d}", transport, random.Random(rng.getrandbits(64)), think, grid_size, api)
+        for i, transport in enumerate(transports)
+    ]
+    before = server_metrics() if server_metrics else None
+    start = time.monotonic()
+    deadline = start + duration
+    threads = [threading.Thread(target=a.run, args=(deadline, max_casts), daemon=True) for a in anglers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    seconds = time.monotonic() - start
+    after = server_metrics() if server_metrics else None
+    return LoadReport(anglers, seconds, before, after)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate concurrent players against the FFRPG web app")
+    parser.add_argument("--url", default=None, help="live server to load; default the Flask test client")
+    parser.add_argument("--anglers", type=int, default=10)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds to keep casting")
+    parser.add_argument("--casts", type=int, default=None, help="stop each angler after this many casts")
+    parser.add_argument("--think", type=float, default=0.0, help="mean seconds between requests")
+    parser.add_argument("--api", action="store_true", help="cast through /api/cast instead of the form")
+    parser.add_argument("--grid-size", type=int, default=None, help="map size the server uses")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--json", action="store_true", help="print the full report as JSON")
+    args = parser.parse_args()
+
+    if args.url:
+        grid_size = args.grid_size or 10
+        transports = [HttpTransport(args.url) for _ in range(args.anglers)]
+        probe = HttpTransport(args.url)
+
+        def server_metrics():
+            try:
+                status, content = probe.fetch("GET", "/metrics")
+            except (http.client.HTTPException, OSError):
+                return None
+            return json.loads(content) if status == 200 else None
+    else:
+        # Keep fake anglers off the real leaderboard
+        os.environ.setdefault("FFRPG_LEADERBOARD_DB", os.path.join(tempfile.mkdtemp(), "leaderboard.db"))
+        import app as webapp
+        from metrics import metrics
+
+        grid_size = args.grid_size or webapp.GRID_SIZE
+        metrics.enable()
+        transports = [TestClientTransport(webapp.app) for _ in range(args.anglers)]
+        server_metrics = metrics.snapshot
+
+    report = run_load(
+        transports, args.duration, args.think, grid_size,
+        max_casts=args.casts, api=args.api, seed=args.seed, server_metrics=server_metrics,
+    )
+    print(json.dumps(report.to_dict(), indent=2) if args.json else report)
+
+
+if __name__ == "__main__":
+    main()
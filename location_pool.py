@@ -0,0 +1,107 @@
+"""Maps generated ahead of time, so changing location doesn't wait on generation.
+
+A LocationPool keeps up to `depth` ready maps for every terrain type. A
+daemon thread tops the queues back up whenever take() removes one.
+FFRPG.set_location takes from the game's pool when it has one and falls
+back to generating in place when the queue for that type is empty.
+
+Each pooled map records the seed it was generated from, and the game
+writes that seed into its history, so replays still rebuild the same map.
+"""
+import random
+import threading
+from collections import deque
+from typing import Dict, Iterable
+
+import numpy as np
+
+from fish_index import FishIndex
+from main import FFRPG, LOCATION_TYPES
+
+
+class PooledMap:
+    __slots__ = ("location_type", "map_seed", "fishfinder_grid", "overhead_grid", "fish_index")
+
+    def __init__(self, location_type: str, map_seed: int, fishfinder_grid: np.ndarray,
+                 overhead_grid: np.ndarray, fish_index: FishIndex):
+        self.location_type = location_type
+        self.map_seed = map_seed
+        self.fishfinder_grid = fishfinder_grid
+        self.overhead_grid = overhead_grid
+        self.fish_index = fish_index
+
+
+class LocationPool:
+    def __init__(self, grid_size: int = 10, depth: int = 4,
+                 location_types: Iterable[str] = LOCATION_TYPES, seed: int | None = None):
+        self.grid_size = grid_size
+        self.depth = depth
+        self._maps: Dict[str, deque] = {t: deque() for t in location_types}
+        # Only the filling thread touches these two
+        self._seeds = random.Random(seed)
+        self._generator = FFRPG(grid_size, seed=0, record=False)
+        self._wake = threading.Event()
+        self._stopped = False
+        self._thread = None
+
+    def start(self) -> "LocationPool":
+        """Start the background filler; returns self for chaining."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="location-pool", daemon=True)
+            self._thread.start()
+        self._wake.set()
+        return self
+
+    def stop(self) -> None:
+        self._stopped = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def take(self, location_type: str) -> PooledMap | None:
+        """Pop a ready map of this type, or None if there isn't one yet."""
+        maps = self._maps.get(location_type)
+        if maps is None:
+            return None
+        try:
+            ready = maps.popleft()
+        except IndexError:
+            ready = None
+        self._wake.set()
+        return ready
+
+    def ready(self, location_type: str) -> int:
+        maps = self._maps.get(location_type)
+        return len(maps) if maps is not None else 0
+
+    def fill(self) -> None:
+        """Generate maps until every type is at depth, one type at a time in turn.
+
+        The background thread calls this; call it directly only before start().
+        """
+        while not self._stopped:
+            short = [t for t, maps in self._maps.items() if len(maps) < self.depth]
+            if not short:
+                return
+            for location_type in short:
+                self._maps[location_type].append(self._build(location_type))
+
+    def _build(self, location_type: str) -> PooledMap:
+        generator = self._generator
+        map_seed = self._seeds.getrandbits(64)
+        generator.generate_location(location_type, map_seed)
+        # generate_location allocates fresh grids and a fresh index, so these stay ours
+        return PooledMap(
+            location_type,
+            map_seed,
+            generator.fishfinder_grid,
+            generator.overhead_grid,
+            generator.fish_index,
+        )
+
+    def _run(self) -> None:
+        while not self._stopped:
+            self._wake.wait()
+            self._wake.clear()
+            self.fill()
@@ -1,178 +1,653 @@
+import base64
 import os
 import random
+import re
 import time
 import json
+from functools import lru_cache
 from typing import Dict, List, Tuple
 
+import numpy as np
+
+from catch_log import CatchLog
+from fish_index import FishIndex
+from map_codec import check_seed, decode_map, encode_map
+from metrics import metrics, perf_counter
+from save_journal import SaveJournal, map_codes
+from terminal import TerminalRenderer
+
+
+# Cell codes stored in the uint8 grids. Both layers share one code space:
+# the fishfinder uses WATER/LAND/FISH and the overhead view WATER/LAND/CAST.
+WATER = 0
+LAND = 1
+FISH = 2
+CAST = 3
+CELL_CHARS = "0.FX"
+
+# Largest window of the map drawn by display_game
+VIEW_SIZE = 10
+# move_view directions; each pans the window by half its size
+PAN_DIRECTIONS = {"n": (-1, 0), "s": (1, 0), "w": (0, -1), "e": (0, 1)}
+
+# A cast "feels" fish within this many cells (3x3 block around the cast)
+BITE_RADIUS = 1
+
+# Fish movement: one tick per FISH_TICK_SECONDS of wall-clock time, caught up
+# lazily (at most MAX_CATCHUP_TICKS at once) whenever the game is used
+FISH_TICK_SECONDS = 1.0
+MAX_CATCHUP_TICKS = 30
+FISH_MOVE_CHANCE = 0.3
+# Chance a moving fish heads for the middle of its school instead of drifting
+SCHOOL_PULL = 0.3
+# Fish that start in the same SCHOOL_SIZE-square block form a school
+SCHOOL_SIZE = 8
+# A cast sends fish within SPOOK_RADIUS fleeing for SPOOK_TICKS ticks
+SPOOK_RADIUS = 2
+SPOOK_TICKS = 3
+
+POSITION_RE = re.compile(r"([a-z]+)(\d+)")
+
+
+# Gear and location options, shared by the console menus and the web app
+LEADER_LINE_TYPES = ["Fluorocarbon", "Monofilament", "Braided"]
+LEADER_DIAMETERS = [
+    "7X (2.0kg)",
+    "6X (2.5kg)",
+    "5X (3.0kg)",
+    "4X (3.5kg)",
+    "3X (4.5kg)",
+    "2X (6.0kg)",
+    "1X (7.0kg)",
+    "0X (8.0kg)",
+]
+LEADER_LENGTHS = list(range(7, 13))
+
+ROD_LENGTHS = [7, 8, 9, 10]
+ROD_WEIGHTS = [3, 4, 5, 6, 7, 8]
+ROD_MATERIALS = ["Graphite", "Fiberglass", "Bamboo"]
+
+FLY_CATEGORIES = ["Dry Flies", "Wet Flies", "Nymphs", "Streamers"]
+FLY_PATTERNS = {
+    "Dry Flies": ["Adams", "Elk Hair Caddis", "Parachute Hopper", "Royal Wulff"],
+    "Wet Flies": ["Partridge & Orange", "Soft Hackle Hare's Ear", "Tellico Nymph"],
+    "Nymphs": ["Pheasant Tail", "Gold-Ribbed Hare's Ear", "Zebra Midge", "Copper John"],
+    "Streamers": ["Woolly Bugger", "Clouser Minnow", "Muddler Minnow", "Zonker"],
+}
+FLY_SIZES = [22, 20, 18, 16, 14, 12, 10, 8, 6, 4]
+
+# Helper to derive category from pattern (for robustness)
+PATTERN_TO_CATEGORY = {
+    pattern: category
+    for category, patterns in FLY_PATTERNS.items()
+    for pattern in patterns
+}
+
+LOCATIONS = ["Mountain Stream", "River Bend", "Alpine Lake", "Coastal Estuary"]
+
+# Species that can take the fly at each named location
+FISH_TYPES = {
+    "Mountain Stream": ["Brook Trout", "Rainbow Trout", "Brown Trout"],
+    "River Bend": ["Brown Trout", "Rainbow Trout", "Smallmouth Bass"],
+    "Alpine Lake": ["Lake Trout", "Arctic Char", "Grayling"],
+    "Coastal Estuary": ["Striped Bass", "Sea-run Cutthroat", "Salmon"]
+}
+
+# Automated fight used by the web game: win ROUNDS_TO_LAND of FIGHT_ROUNDS
+FIGHT_ROUNDS = 3
+FIGHT_ROUND_WIN_CHANCE = 0.65
+ROUNDS_TO_LAND = 2
+XP_PER_INCH = 10
+# Console pause between casting and the result; skipped in turbo mode
+CAST_PAUSE_SECONDS = 1.0
+
+# Console saves go to the journal; the JSON file is the import/export format
+SAVE_JOURNAL = 'ffrpg_save.journal'
+SAVE_JSON = 'ffrpg_save.json'
+SAVE_MAP = 'ffrpg_save.map'
+
+
+# Terrain generators, one per kind of location
+LOCATION_TYPES = ["river", "lake", "stream", "estuary"]
+
+
+def location_type_for(location: str) -> str:
+    """Map a location name like 'Alpine Lake' to its terrain generator."""
+    if "Stream" in location:
+        return "stream"
+    if "Lake" in location:
+        return "lake"
+    if "Estuary" in location:
+        return "estuary"
+    return "river"
+
+
+def bite_chance(fish_nearby: bool, fly_category: str, location: str) -> float:
+    """Probability that a cast gets a bite."""
+    # Higher chance if fish are nearby
+    base_chance = 0.4 if fish_nearby else 0.15
+    
+    # Equipment bonuses
+    if fly_category == "Dry Flies" and "Stream" in location:
+        base_chance += 0.2
+    elif fly_category == "Streamers" and "Lake" in location:
+        base_chance += 0.15
+    elif fly_category == "Nymphs":
+        base_chance += 0.1  # Nymphs work everywhere
+    return base_chance
+
+
+def size_range(rod_weight: int, species: str) -> Tuple[int, int]:
+    """Inclusive (min, max) size in inches of a hooked fish."""
+    min_size = 6
+    max_size = 24
+    
+    # Adjust based on rod and leader match
+    if rod_weight == 3 and "Trout" in species:
+        max_size = 18  # Lighter rod better for smaller fish
+    elif rod_weight >= 7 and "Bass" in species:
+        min_size = 10  # Heavier rod better for larger fish
+    return min_size, max_size
+
+
+@lru_cache(maxsize=256)
+def odds_for(location: str, fly_category: str, rod_weight: int) -> "OddsEngine":
+    """Shared OddsEngine for one setup; games with the same setup share tables."""
+    return OddsEngine(location, fly_category, rod_weight)
+
+
+def column_label(col: int) -> str:
+    """Spreadsheet-style column name: 0 -> 'a', 25 -> 'z', 26 -> 'aa'."""
+    label = ""
+    col += 1
+    while col:
+        col, rem = divmod(col - 1, 26)
+        label = chr(ord('a') + rem) + label
+    return label
+
+
+def column_index(label: str) -> int:
+    """Inverse of column_label."""
+    col = 0
+    for ch in label:
+        col = col * 26 + (ord(ch) - ord('a') + 1)
+    return col - 1
+
+
+def parse_position(text: str) -> Tuple[int, int] | None:
+    """Parse a cast like 'b3' or 'aa123' into a 0-based (row, col)."""
+    match = POSITION_RE.fullmatch(text.strip().lower())
+    if not match:
+        return None
+    return int(match.group(2)) - 1, column_index(match.group(1))
+
+
+def format_position(row: int, col: int) -> str:
+    return f"{column_label(col)}{row + 1}"
+
+
+def _clamped_walk(start: int, steps: np.ndarray, low: int, high: int) -> np.ndarray:
+    """Random walk from start, clamped into [low, high] after every step.
+
+    Matches the scalar loop ``x = max(low, min(x + step, high))`` exactly,
+    but works on cumulative sums. Each pass fixes the walk up to the next
+    point where it leaves the bounds, so there is one pass per clamp.
+    """
+    walk = start + np.cumsum(steps)
+    i = 0
+    while True:
+        outside = np.flatnonzero((walk[i:] < low) | (walk[i:] > high))
+        if outside.size == 0:
+            return walk
+        j = i + outside[0]
+        walk[j:] += (low if walk[j] < low else high) - walk[j]
+        i = j + 1
+
 
 class FFRPG:
-    def __init__(self):
+    def __init__(self, grid_size: int = 10, seed: int | None = None, record: bool = True):
+        if grid_size < 10:
+            raise ValueError("grid_size must be at least 10")
+        # Every random draw goes through this game's own generator, so games
+        # don't disturb each other and the seed reproduces a whole session
+        self.seed = check_seed(seed) if seed is not None else random.SystemRandom().getrandbits(63)
+        self.rng = random.Random(self.seed)
+        # Map generations and casts in order, for replay (see replay.py)
+        self.history: List[tuple] | None = [] if record else None
         self.player = Player("Shrek", 0, 0)
-        self.grid_size = 10
+        self.grid_size = grid_size
         self.fishfinder_grid = self.create_empty_grid_ff()
         self.overhead_grid = self.create_empty_grid_OH()
+        self.fish_index = FishIndex(self.fishfinder_grid == FISH)
+        self.renderer = GridRenderer(self)
+        # Console output; created on the first terminal draw
+        self.terminal = None
+        # Console input: every answer is read through self.input, and turbo
+        # skips the "Press Enter" prompts and the pause on each cast
+        self.input = input
+        self.turbo = False
         self.current_rod = None
         self.current_leader = None
         self.current_fly = None
         self.current_location = None
+        # Top-left cell of the window display_game draws
+        self.view_origin = (0, 0)
+        # Optional LocationPool that set_location takes ready-made maps from
+        self.location_pool = None
+        # Optional SharedLocations; set_location then joins other games' waters
+        self.shared_locations = None
+        # The SharedWaters this game is fishing, if any (see shared_waters.py)
+        self.waters = None
+        # OddsEngine for the current setup, swapped out when the setup changes
+        self._odds = None
+        # Bumped whenever fish appear, disappear or move; keys the heatmap and odds-window caches
+        self.fish_version = 0
+        self._heatmap = None
+        self._heatmap_key = None
+        # Moving fish; built from the grid on first use. None freezes the fish
+        self.fish_tick_seconds = FISH_TICK_SECONDS
+        self._school = None
+        self._fish_clock = time.monotonic()
+        self.journal = SaveJournal(SAVE_JOURNAL, map_path=SAVE_MAP)
+        # The map as the journal last saved it (see map_codes), so a save
+        # only journals the cells that changed; None saves it whole
+        self._saved_map = None
         
     def create_empty_grid_OH(self):
-        grid = []
-        for _ in range(self.grid_size):
-            grid.append(['0'] * self.grid_size)
-        return grid
+        return np.full((self.grid_size, self.grid_size), WATER, dtype=np.uint8)
     
     def create_empty_grid_ff(self):
-        # Use 0 for water, . for land
-        grid = []
-        for _ in range(self.grid_size):
-            grid.append(['0'] * self.grid_size)
-        return grid
+        # WATER for water, LAND for land, FISH where a fish is holding
+        return np.full((self.grid_size, self.grid_size), WATER, dtype=np.uint8)
     
-    def generate_location(self, location_type):
+    def resize(self, grid_size: int) -> None:
+        """Switch to grid_size x grid_size, with an empty map and no location."""
+        if grid_size < 10:
+            raise ValueError("grid_size must be at least 10")
+        self.grid_size = grid_size
+        self.fishfinder_grid = self.create_empty_grid_ff()
+        self.overhead_grid = self.create_empty_grid_OH()
+        self.fish_index = None
+        self.current_location = None
+        self.view_origin = (0, 0)
+        self._new_fish()
+        self.renderer.invalidate()
+
+    def generate_location(self, location_type, map_seed: int | None = None):
         # Reset grids
         self.fishfinder_grid = self.create_empty_grid_ff()
         self.overhead_grid = self.create_empty_grid_OH()
 
+        # Whole-map sampling goes through NumPy, seeded from the game's stream
+        # unless the caller fixes the map with map_seed
+        if self.history is not None:
+            self.history.append(
+                ("generate", location_type) if map_seed is None else ("generate", location_type, map_seed)
+            )
+        if map_seed is None:
+            map_seed = self.rng.getrandbits(64)
+        rng = np.random.default_rng(map_seed)
+
         # Generate land features based on location type
         if location_type == "river":
-            self._generate_river()
+            self._generate_river(rng)
         elif location_type == "lake":
-            self._generate_lake()
+            self._generate_lake(rng)
         elif location_type == "stream":
-            self._generate_stream()
+            self._generate_stream(rng)
+        elif location_type == "estuary":
+            self._generate_estuary(rng)
         
         # Generate fish in the location
-        self.generate_fish()
+        self.generate_fish(rng)
         
         # Copy to overhead view (but don't show fish)
-        for y in range(self.grid_size):
-            for x in range(self.grid_size):
-                if self.fishfinder_grid[y][x] == '.':
-                    self.overhead_grid[y][x] = '.'
-                else:
-                    self.overhead_grid[y][x] = '0'
+        self.overhead_grid[self.fishfinder_grid == LAND] = LAND
+        self.fish_index = FishIndex(self.fishfinder_grid == FISH)
                 
         self.current_location = location_type
+        self.view_origin = (0, 0)
+        self._new_fish()
+        self.renderer.invalidate()
 
-    def generate_fish(self):
-        # Generate fish in the fishfinder grid
-        for _ in range(random.randint(5, 10)):
-            x = random.randint(0, self.grid_size - 1)
-            y = random.randint(0, self.grid_size - 1)
-            self.fishfinder_grid[y][x] = 'F'
-
-    def _generate_river(self):
-        # Create river banks (land)
-        for y in range(self.grid_size):
-            # Left bank
-            for x in range(random.randint(1, 3)):
-                self.fishfinder_grid[y][x] = '.'
-            
-            # Right bank
-            for x in range(self.grid_size - random.randint(1, 3), self.grid_size):
-                self.fishfinder_grid[y][x] = '.'
+    def set_location(self, location: str) -> None:
+        """Move to a named location such as 'Alpine Lake'.
+
+        Takes a ready map from location_pool when it has one for this
+        terrain and grid size, and generates one otherwise.
+        """
+        if self.shared_locations is not None:
+            self.join_waters(self.shared_locations.get(location))
+            return
+        location_type = location_type_for(location)
+        pool = self.location_pool
+        ready = None
+        if pool is not None and pool.grid_size == self.grid_size:
+            ready = pool.take(location_type)
+        if ready is None:
+            self.generate_location(location_type)
+        else:
+            self.install_map(ready)
+        self.current_location = location
+
+    def install_map(self, ready) -> None:
+        """Switch to a PooledMap (see location_pool.py)."""
+        if self.history is not None:
+            # Recorded with its seed so replay can regenerate the same map
+            self.history.append(("generate", ready.location_type, ready.map_seed))
+        self.fishfinder_grid = ready.fishfinder_grid
+        self.overhead_grid = ready.overhead_grid
+        self.fish_index = ready.fish_index
+        self.current_location = ready.location_type
+        self.view_origin = (0, 0)
+        self._new_fish()
+        self.renderer.invalidate()
+
+    def join_waters(self, waters) -> None:
+        """Fish a SharedWaters map together with every other game on it.
+
+        The game adopts the shared grids; from here on its casts lock the
+        regions they touch and the waters move the fish.
+        """
+        self.fishfinder_grid = waters.fishfinder_grid
+        self.overhead_grid = waters.overhead_grid
+        self.fish_index = None
+        self.current_location = waters.location
+        self.view_origin = (0, 0)
+        self._new_fish()
+        self.waters = waters
+        self.renderer.invalidate()
+        # Other players' casts are part of the map now, so it can't be replayed
+        self.history = None
+
+    def generate_fish(self, rng: np.random.Generator | None = None):
+        # Generate fish in the fishfinder grid, 5-10 for every 100 cells
+        if rng is None:
+            rng = np.random.default_rng(self.rng.getrandbits(64))
+        per_hundred = max(1, self.grid_size * self.grid_size // 100)
+        count = int(rng.integers(5, 11)) * per_hundred
+        ys = rng.integers(0, self.grid_size, size=count)
+        xs = rng.integers(0, self.grid_size, size=count)
+        self.fishfinder_grid[ys, xs] = FISH
+
+    @property
+    def fish_index(self) -> FishIndex:
+        """The FishIndex of the current grid, rebuilt on first use after fish moved."""
+        if self._fish_index is None:
+            self._fish_index = FishIndex(self.fishfinder_grid == FISH)
+        return self._fish_index
+
+    @fish_index.setter
+    def fish_index(self, index: FishIndex | None) -> None:
+        self._fish_index = index
+
+    def has_fish_nearby(self, row: int, col: int, radius: int = BITE_RADIUS) -> bool:
+        return self.fish_count_nearby(row, col, radius) > 0
+
+    def fish_count_nearby(self, row: int, col: int, radius: int = BITE_RADIUS) -> int:
+        if self.waters is not None:
+            return self.waters.count_within(row, col, radius)
+        if self._fish_index is None:
+            # Fish moved since the index was built; one small window is
+            # cheaper to count than the whole table is to rebuild
+            top, left = max(row - radius, 0), max(col - radius, 0)
+            window = self.fishfinder_grid[top:row + radius + 1, left:col + radius + 1]
+            return int(np.count_nonzero(window == FISH))
+        return self._fish_index.count_within(row, col, radius)
+
+    def remove_fish(self, row: int, col: int) -> bool:
+        """Take the fish at (row, col) off the map; returns False if there was none."""
+        if self.waters is not None:
+            return self.waters.remove_fish(row, col)
+        if self.fishfinder_grid[row, col] != FISH:
+            return False
+        self.fishfinder_grid[row, col] = WATER
+        if self._fish_index is not None:
+            self._fish_index.remove(row, col)
+        if self._school is not None:
+            self._school.remove(row, col)
+        self.fish_version += 1
+        # The fish counted towards the bite odds of every cell around it
+        for y in range(row - BITE_RADIUS, row + BITE_RADIUS + 1):
+            self.renderer.mark_dirty(y)
+        return True
+
+    def _new_fish(self) -> None:
+        # A whole new fish layout: movement state is rebuilt from the grid
+        self.waters = None
+        self._school = None
+        self._fish_clock = time.monotonic()
+        self._saved_map = None
+        self.fish_version += 1
+
+    def tick_fish(self, now: float | None = None) -> int:
+        """Move the fish for the whole ticks of wall-clock time since the last call.
+
+        Called whenever the game is used, so idle games cost nothing; a long
+        idle spell is capped at MAX_CATCHUP_TICKS. Returns the ticks run.
+        """
+        if self.waters is not None:
+            return self.waters.tick_fish(now)
+        if self.fish_tick_seconds is None:
+            return 0
+        if now is None:
+            now = time.monotonic()
+        ticks = int((now - self._fish_clock) // self.fish_tick_seconds)
+        if ticks <= 0:
+            return 0
+        self._fish_clock += ticks * self.fish_tick_seconds
+        ticks = min(ticks, MAX_CATCHUP_TICKS)
+        self.advance_fish(ticks)
+        return ticks
+
+    def advance_fish(self, ticks: int) -> None:
+        """Run `ticks` movement steps now, whatever the clock says."""
+        if self.waters is not None:
+            self.waters.advance_fish(ticks)
+            return
+        if self.history is not None:
+            self.history.append(("tick", ticks))
+        if self._school is None:
+            self._school = FishSchool(self.fishfinder_grid == FISH)
+        rng = np.random.default_rng(self.rng.getrandbits(64))
+        moved = [self._school.step(self.fishfinder_grid, rng) for _ in range(ticks)]
+        rows = np.unique(np.concatenate(moved)) if moved else []
+        if not len(rows):
+            return
+
+        # Rebuilding the index costs a pass over the whole map, so it waits
+        # until something needs it (see fish_index)
+        self.fish_index = None
+        self.fish_version += 1
+        # Moves change the odds of the cells around both ends
+        if len(rows) > 2 * VIEW_SIZE:
+            self.renderer.invalidate()
+        else:
+            for row in rows.tolist():
+                for y in range(row - BITE_RADIUS, row + BITE_RADIUS + 1):
+                    self.renderer.mark_dirty(y)
+
+    def spook_fish(self, row: int, col: int) -> None:
+        """Scatter the fish around a cast at (row, col); they flee on the next ticks."""
+        if self.waters is not None:
+            self.waters.spook(row, col)
+            return
+        if self._school is None:
+            self._school = FishSchool(self.fishfinder_grid == FISH)
+        self._school.spook(row, col)
+
+    def mark_cast(self, row: int, col: int) -> None:
+        """Show a cast at (row, col) on the overhead view."""
+        self.overhead_grid[row, col] = CAST
+        if self.waters is not None:
+            self.waters.touch(row, col)
+        self.renderer.mark_dirty(row)
+
+    def map_bytes(self) -> bytes:
+        """The current map, bit-packed (see map_codec)."""
+        return encode_map(self.overhead_grid, self.fishfinder_grid == FISH, self.seed, self.view_origin)
+
+    def _map_codes(self) -> np.ndarray:
+        return map_codes(self.overhead_grid, self.fishfinder_grid == FISH)
+
+    def restore_map(self, view_origin: Tuple[int, int], overhead: np.ndarray, fish: np.ndarray) -> None:
+        """Install a decoded map in place of the current one."""
+        fishfinder = np.where(overhead == LAND, LAND, WATER).astype(np.uint8)
+        fishfinder[fish] = FISH
+        self.fishfinder_grid = fishfinder
+        self.overhead_grid = overhead
+        self.fish_index = FishIndex(fish)
+        self.view_origin = view_origin
+        self._new_fish()
+        self.renderer.invalidate()
+        # Replay rebuilds maps from the seed alone, which can't reproduce this one
+        self.history = None
+
+    def _generate_river(self, rng: np.random.Generator):
+        # Create river banks (land): 1-3 cells on each side, drawn per row
+        n = self.grid_size
+        cols = np.arange(n)
+        left = rng.integers(1, 4, size=(n, 1))
+        right = rng.integers(1, 4, size=(n, 1))
+        self.fishfinder_grid[(cols < left) | (cols >= n - right)] = LAND
     
-    def _generate_lake(self):
-        # Create shoreline
-        for y in range(self.grid_size):
-            if y < 2 or y > self.grid_size - 3:
-                # Top and bottom shorelines
-                for x in range(self.grid_size):
-                    if random.random() < 0.7:
-                        self.fishfinder_grid[y][x] = '.'
+    def _generate_lake(self, rng: np.random.Generator):
+        # Create shoreline: the top and bottom two rows are 70% land
+        n = self.grid_size
+        shore = np.zeros((n, n), dtype=bool)
+        shore[[0, 1, n - 2, n - 1]] = rng.random((4, n)) < 0.7
+        self.fishfinder_grid[shore] = LAND
     
-    def _generate_stream(self):
-        # Create meandering path
-        center_x = self.grid_size // 2
-        for y in range(self.grid_size):
-            center_x += random.randint(-1, 1)
-            center_x = max(3, min(center_x, self.grid_size - 4))  # Keep in bounds
-            
-            # Stream width varies between 3-5 cells
-            width = random.randint(3, 5)
-            left_bank = center_x - width // 2
-            right_bank = center_x + width // 2
-            
-            # Mark banks as land
-            for x in range(self.grid_size):
-                if x < left_bank or x > right_bank:
-                    self.fishfinder_grid[y][x] = '.'
+    def _generate_stream(self, rng: np.random.Generator):
+        # Create meandering path: the centre line is a random walk kept in bounds
+        n = self.grid_size
+        centers = _clamped_walk(n // 2, rng.integers(-1, 2, size=n), 3, n - 4)
+        
+        # Stream width varies between 3-5 cells
+        widths = rng.integers(3, 6, size=n)
+        left_bank = (centers - widths // 2)[:, None]
+        right_bank = (centers + widths // 2)[:, None]
+        
+        # Mark banks as land
+        cols = np.arange(n)
+        self.fishfinder_grid[(cols < left_bank) | (cols > right_bank)] = LAND
+
+    def _generate_estuary(self, rng: np.random.Generator):
+        # A river mouth opening towards the sea: banks narrow from a third of
+        # the width at the top row to nothing at the bottom
+        n = self.grid_size
+        rows = np.arange(n)
+        taper = (n // 3) * (n - 1 - rows) // (n - 1)
+        left = (taper + rng.integers(0, 2, size=n))[:, None]
+        right = (taper + rng.integers(0, 2, size=n))[:, None]
+        cols = np.arange(n)
+        land = (cols < left) | (cols >= n - right)
+        # Sandbars scattered over the open lower half
+        bars = rng.random((n, n)) < 0.08
+        bars[:n // 2] = False
+        self.fishfinder_grid[land | bars] = LAND
+
+    def visible_window(self) -> Tuple[int, int, int, int]:
+        """Return (first_row, end_row, first_col, end_col) of the drawn window."""
+        size = min(VIEW_SIZE, self.grid_size)
+        row0, col0 = self.view_origin
+        return row0, row0 + size, col0, col0 + size
+
+    def center_view(self, row: int, col: int) -> None:
+        """Move the display window so that (row, col) is roughly centred."""
+        size = min(VIEW_SIZE, self.grid_size)
+        limit = self.grid_size - size
+        self.view_origin = (
+            max(0, min(row - size // 2, limit)),
+            max(0, min(col - size // 2, limit)),
+        )
+
+    def reseed(self, seed: int) -> None:
+        """Carry on the random stream from seed; recorded, so replays do the same."""
+        self.rng = random.Random(seed)
+        if self.history is not None:
+            self.history.append(("reseed", seed))
+
+    def resume_seed(self) -> int:
+        """Draw a seed for the rest of the random stream and switch to it.
+
+        Saves store the result, so a loaded game carries on from where it
+        was saved, exactly as this one does, instead of rewinding to its
+        first draw.
+        """
+        seed = self.rng.getrandbits(64)
+        self.reseed(seed)
+        return seed
+
+    def move_view(self, text: str) -> bool:
+        """Centre the view on a position like 'm40', or pan it with n/s/e/w.
+
+        Returns False, leaving the view alone, if text is neither or the
+        position is off the map.
+        """
+        text = text.strip().lower()
+        size = min(VIEW_SIZE, self.grid_size)
+        if text in PAN_DIRECTIONS:
+            d_row, d_col = PAN_DIRECTIONS[text]
+            row0, col0 = self.view_origin
+            row = row0 + size // 2 + d_row * (size // 2)
+            col = col0 + size // 2 + d_col * (size // 2)
+        else:
+            position = parse_position(text)
+            if position is None:
+                return False
+            row, col = position
+            if not (0 <= row < self.grid_size and 0 <= col < self.grid_size):
+                return False
+        self.center_view(row, col)
+        return True
+
+    def look_around(self):
+        print("\nMove the view to scout the fishfinder before casting.")
+        print("Enter a grid position to centre on (e.g., m40), or n/s/e/w to pan:")
+        if not self.move_view(self.input("View> ")):
+            print("Invalid position. Use letters+number on the map (e.g., b3) or n/s/e/w")
+            self.pause("Press Enter to try again...")
     
     def display_game(self, as_string: bool = False) -> str | None:
         """Render the current game state.
 
-        If as_string is False (default), this behaves like the original
-        terminal version and prints directly. If True, it returns the
-        rendered text as a single string without clearing the screen.
-        """
-        lines: List[str] = []
-
-        # Top border and header
-        lines.append("#" * 83)
-        lines.append(" " * 32 + "FFRPG:FlyFlishingRPG")
-        lines.append("#" * 83)
-        
-        # Player info and equipment
-        lines.append(
-            f"Fisherman: {self.player.name}" + " " * 10 +
-            f"Flyrod: {self.current_rod or ''}" + " " * 18 +
-            f"Fly: {self.current_fly or ''}"
-        )
-        
-        lines.append(
-            f"lvl: {self.player.level} xp: {self.player.xp:06d} total fish: {len(self.player.catch_record)}" + " " * 6 +
-            f"Leader: {self.current_leader or ''}" + " " * 18 +
-            f"Location: {self.current_location or ''}"
-        )
-        
-        lines.append("-" * 83)
-        
-        # Grid headers
-        lines.append("---------------fishfinder----------------|---------------OverHead--------------------")
-        lines.append(" " * 40 + "|")
-        
-        # Column labels
-        lines.append("      a  b  c  d  e  f  g  h  i  j       |            a  b  c  d  e  f  g  h  i  j")
-        
-        # Display both grids side by side
-        for y in range(self.grid_size):
-            # Left grid (fishfinder)
-            left_row = f"    {y+1} "
-            for x in range(self.grid_size):
-                left_row += f"{self.fishfinder_grid[y][x]}  "
-            
-            # Right grid (overhead)
-            right_row = f"          {y+1} "
-            for x in range(self.grid_size):
-                right_row += f"{self.overhead_grid[y][x]}  "
-            
-            lines.append(f"{left_row}      |{right_row}")
-        
-        lines.append("\n" + "#" * 83)
+        If as_string is False (default), the frame is drawn on the terminal,
+        rewriting only what changed since the last one (see terminal.py).
+        If True, it returns the rendered text as a single string.
 
-        rendered = "\n".join(lines)
+        Only the window of the map starting at view_origin is drawn, so the
+        cost doesn't depend on the size of the location. Rows and the header
+        come from the GridRenderer cache unless something changed them.
+        """
+        self.tick_fish()
+        rendered = self.renderer.render()
 
         if as_string:
             # For web/other front-ends, just return the text
             return rendered
         
-        # Original terminal behaviour
-        os.system('cls' if os.name == 'nt' else 'clear')
-        print(rendered)
+        if self.terminal is None:
+            self.terminal = TerminalRenderer()
+        self.terminal.draw(rendered)
         return None
     
+    def pause(self, prompt: str = "Press Enter to continue...") -> None:
+        """Wait for Enter, unless turbo is on."""
+        if not self.turbo:
+            self.input(prompt)
+
     def build_leader(self):
         print("\nBuild Your Leader")
         print("-" * 30)
         
         # Leader line options
-        line_types = ["Fluorocarbon", "Monofilament", "Braided"]
+        line_types = LEADER_LINE_TYPES
         print("\nSelect leader line type:")
         for i, line in enumerate(line_types, 1):
             print(f"{i}. {line}")
         
-        line_choice = input("Enter choice (1-3): ")
+        line_choice = self.input("Enter choice (1-3): ")
         try:
             line_type = line_types[int(line_choice) - 1]
         except (ValueError, IndexError):
@@ -180,12 +655,12 @@ class FFRPG:
             line_type = "Monofilament"
         
         # Leader tippet diameter
-        diameters = ["7X (2.0kg)", "6X (2.5kg)", "5X (3.0kg)", "4X (3.5kg)", "3X (4.5kg)", "2X (6.0kg)", "1X (7.0kg)", "0X (8.0kg)"]
+        diameters = LEADER_DIAMETERS
         print("\nSelect tippet diameter:")
         for i, dia in enumerate(diameters, 1):
             print(f"{i}. {dia}")
         
-        dia_choice = input("Enter choice (1-8): ")
+        dia_choice = self.input("Enter choice (1-8): ")
         try:
             diameter = diameters[int(dia_choice) - 1]
         except (ValueError, IndexError):
@@ -193,10 +668,10 @@ class FFRPG:
             diameter = "5X (3.0kg)"
         
         # Leader length
-        length = input("\nEnter leader length in feet (7-12): ")
+        length = self.input("\nEnter leader length in feet (7-12): ")
         try:
             length = int(length)
-            if length < 7 or length > 12:
+            if length not in LEADER_LENGTHS:
                 print("Invalid length. Using 9 feet.")
                 length = 9
         except ValueError:
@@ -206,19 +681,19 @@ class FFRPG:
         # Create the leader
         self.current_leader = Leader(line_type, diameter, length)
         print(f"\nLeader built: {line_type}, {diameter}, {length} feet")
-        input("Press Enter to continue...")
+        self.pause()
     
     def build_rod(self):
         print("\nBuild Your Fly Rod")
         print("-" * 30)
         
         # Rod length options
-        lengths = [7, 8, 9, 10]
+        lengths = ROD_LENGTHS
         print("\nSelect rod length (feet):")
         for i, length in enumerate(lengths, 1):
             print(f"{i}. {length}'")
         
-        length_choice = input("Enter choice (1-4): ")
+        length_choice = self.input("Enter choice (1-4): ")
         try:
             rod_length = lengths[int(length_choice) - 1]
         except (ValueError, IndexError):
@@ -226,12 +701,12 @@ class FFRPG:
             rod_length = 9
         
         # Rod weight options
-        weights = [3, 4, 5, 6, 7, 8]
+        weights = ROD_WEIGHTS
         print("\nSelect rod weight:")
         for i, weight in enumerate(weights, 1):
             print(f"{i}. {weight}-weight")
         
-        weight_choice = input("Enter choice (1-6): ")
+        weight_choice = self.input("Enter choice (1-6): ")
         try:
             rod_weight = weights[int(weight_choice) - 1]
         except (ValueError, IndexError):
@@ -239,12 +714,12 @@ class FFRPG:
             rod_weight = 5
         
         # Rod material
-        materials = ["Graphite", "Fiberglass", "Bamboo"]
+        materials = ROD_MATERIALS
         print("\nSelect rod material:")
         for i, material in enumerate(materials, 1):
             print(f"{i}. {material}")
         
-        material_choice = input("Enter choice (1-3): ")
+        material_choice = self.input("Enter choice (1-3): ")
         try:
             rod_material = materials[int(material_choice) - 1]
         except (ValueError, IndexError):
@@ -254,39 +729,31 @@ class FFRPG:
         # Create the rod
         self.current_rod = FlyRod(rod_length, rod_weight, rod_material)
         print(f"\nRod built: {rod_length}' {rod_weight}-weight {rod_material}")
-        input("Press Enter to continue...")
+        self.pause()
     
     def build_fly(self):
         print("\nSelect Your Fly")
         print("-" * 30)
         
         # Fly categories
-        categories = ["Dry Flies", "Wet Flies", "Nymphs", "Streamers"]
+        categories = FLY_CATEGORIES
         print("\nSelect fly category:")
         for i, category in enumerate(categories, 1):
             print(f"{i}. {category}")
         
-        cat_choice = input("Enter choice (1-4): ")
+        cat_choice = self.input("Enter choice (1-4): ")
         try:
             category = categories[int(cat_choice) - 1]
         except (ValueError, IndexError):
             print("Invalid choice. Using Dry Flies.")
             category = "Dry Flies"
         
-        # Specific fly patterns based on category
-        fly_patterns = {
-            "Dry Flies": ["Adams", "Elk Hair Caddis", "Parachute Hopper", "Royal Wulff"],
-            "Wet Flies": ["Partridge & Orange", "Soft Hackle Hare's Ear", "Tellico Nymph"],
-            "Nymphs": ["Pheasant Tail", "Gold-Ribbed Hare's Ear", "Zebra Midge", "Copper John"],
-            "Streamers": ["Woolly Bugger", "Clouser Minnow", "Muddler Minnow", "Zonker"]
-        }
-        
         print(f"\nSelect {category} pattern:")
-        patterns = fly_patterns[category]
+        patterns = FLY_PATTERNS[category]
         for i, pattern in enumerate(patterns, 1):
             print(f"{i}. {pattern}")
         
-        pattern_choice = input(f"Enter choice (1-{len(patterns)}): ")
+        pattern_choice = self.input(f"Enter choice (1-{len(patterns)}): ")
         try:
             pattern = patterns[int(pattern_choice) - 1]
         except (ValueError, IndexError):
@@ -294,12 +761,12 @@ class FFRPG:
             pattern = patterns[0]
         
         # Fly size
-        sizes = [22, 20, 18, 16, 14, 12, 10, 8, 6, 4]
+        sizes = FLY_SIZES
         print("\nSelect fly size:")
         for i, size in enumerate(sizes, 1):
             print(f"{i}. Size {size}")
         
-        size_choice = input("Enter choice (1-10): ")
+        size_choice = self.input("Enter choice (1-10): ")
         try:
             size = sizes[int(size_choice) - 1]
         except (ValueError, IndexError):
@@ -309,18 +776,18 @@ class FFRPG:
         # Create the fly
         self.current_fly = Fly(pattern, category, size)
         print(f"\nFly selected: {pattern}, Size {size}")
-        input("Press Enter to continue...")
+        self.pause()
     
     def select_location(self):
         print("\nSelect Fishing Location")
         print("-" * 30)
         
-        locations = ["Mountain Stream", "River Bend", "Alpine Lake", "Coastal Estuary"]
+        locations = LOCATIONS
         print("\nAvailable locations:")
         for i, location in enumerate(locations, 1):
             print(f"{i}. {location}")
         
-        choice = input("Enter choice (1-4): ")
+        choice = self.input("Enter choice (1-4): ")
         try:
             location = locations[int(choice) - 1]
         except (ValueError, IndexError):
@@ -328,101 +795,83 @@ class FFRPG:
             location = "Mountain Stream"
         
         # Generate the location grid
-        location_type = "river"
-        if "Stream" in location:
-            location_type = "stream"
-        elif "Lake" in location:
-            location_type = "lake"
-        
-        self.generate_location(location_type)
-        self.current_location = location
+        self.set_location(location)
         print(f"\nLocation set to: {location}")
-        input("Press Enter to continue...")
+        self.pause()
     
     def start_fishing(self):
         if not self.current_rod:
             print("\nYou need to build a rod first!")
-            input("Press Enter to continue...")
+            self.pause()
             return
             
         if not self.current_leader:
             print("\nYou need to build a leader first!")
-            input("Press Enter to continue...")
+            self.pause()
             return
             
         if not self.current_fly:
             print("\nYou need to select a fly first!")
-            input("Press Enter to continue...")
+            self.pause()
             return
             
         if not self.current_location:
             print("\nYou need to select a location first!")
-            input("Press Enter to continue...")
+            self.pause()
             return
         
         print("\nStarting to fish...")
         print("Select a grid position to cast to (e.g., b3):")
         
-        cast_position = input("> ").strip().lower()
-        if len(cast_position) != 2 or not cast_position[0].isalpha() or not cast_position[1].isdigit():
-            print("Invalid position format. Use letter+number (e.g., b3)")
-            input("Press Enter to try again...")
+        position = parse_position(self.input("> "))
+        if position is None:
+            print("Invalid position format. Use letters+number (e.g., b3)")
+            self.pause("Press Enter to try again...")
             return
         
-        col = ord(cast_position[0]) - ord('a')
-        row = int(cast_position[1]) - 1
+        row, col = position
         
         if col < 0 or col >= self.grid_size or row < 0 or row >= self.grid_size:
             print("Position out of bounds!")
-            input("Press Enter to try again...")
+            self.pause("Press Enter to try again...")
             return
         
-        if self.fishfinder_grid[row][col] == '.':
+        if self.fishfinder_grid[row, col] == LAND:
             print("You can't cast onto land!")
-            input("Press Enter to try again...")
+            self.pause("Press Enter to try again...")
             return
         
-        # Show the cast on the overhead view
-        self.overhead_grid[row][col] = 'X'
+        # Show the cast on the overhead view; the splash scatters nearby fish
+        self.mark_cast(row, col)
+        self.spook_fish(row, col)
+        self.center_view(row, col)
         self.display_game()
         
         print("\nCasting...")
-        time.sleep(1)
+        if not self.turbo:
+            time.sleep(CAST_PAUSE_SECONDS)
+        
+        # Interactive fights can't be replayed; mark where this game's random
+        # stream stops being reproducible from the history alone
+        if self.history is not None:
+            self.history.append(("console_cast",))
         
         # Determine if there's a bite - higher chance if fish are nearby
-        bite_chance = random.random()
-        fish_nearby = False
+        roll = self.rng.random()
         
         # Check for fish in the cast position and surrounding area
-        for dy in range(-1, 2):
-            for dx in range(-1, 2):
-                check_y, check_x = row + dy, col + dx
-                if (0 <= check_y < self.grid_size and 0 <= check_x < self.grid_size and 
-                    self.fishfinder_grid[check_y][check_x] == 'F'):
-                    fish_nearby = True
-                    break
+        fish_nearby = self.has_fish_nearby(row, col)
         
-        # Adjust bite chance based on equipment match and fish presence
-        base_chance = 0.4 if fish_nearby else 0.15
-        
-        # Equipment bonuses
-        if self.current_fly.category == "Dry Flies" and "Stream" in self.current_location:
-            base_chance += 0.2
-        elif self.current_fly.category == "Streamers" and "Lake" in self.current_location:
-            base_chance += 0.15
-        elif self.current_fly.category == "Nymphs":
-            base_chance += 0.1  # Nymphs work everywhere
-            
-        if bite_chance < base_chance:
+        if roll < self.odds().bite[fish_nearby]:
             # Remove fish from that position if caught
             if fish_nearby:
-                self.fishfinder_grid[row][col] = '0'
+                self.remove_fish(row, col)
             self._fish_on(row, col)
         else:
             print("No bites. Try casting again or change your approach.")
             if fish_nearby:
                 print("Your fishfinder shows fish activity in this area!")
-            input("Press Enter to continue...")
+            self.pause()
 
     def start_fishing_web(self, cast_position: str | None = None) -> str:
         """Web-friendly version of start_fishing.
@@ -430,8 +879,103 @@ class FFRPG:
         This avoids input()/print() and instead returns a summary string
         describing what happened during the cast.
         """
-        messages: List[str] = []
+        return self.cast_web(cast_position).message
+
+    def cast_web(self, cast_position: str | None = None) -> "CastResult":
+        """Run one non-interactive cast and return a structured CastResult.
+
+        Same rules as start_fishing_web, which just returns the result's
+        message; API clients use the structured fields instead.
+        """
+        self.tick_fish()
+        phases = metrics.phases("cast")
+        result = CastResult()
+        self._ensure_web_defaults(result.messages)
+        gear = self.gear_snapshot()
+        phases.mark("setup")
+        self._cast_web(cast_position, result, phases)
+        phases.finish()
+        metrics.incr("casts")
+        metrics.incr(f"casts.{result.outcome}")
+        if self.history is not None:
+            self.history.append(
+                ("cast", cast_position or None, *gear, result.outcome, result.species, result.size)
+            )
+        return result
+
+    def odds(self) -> "OddsEngine":
+        """Lookup tables for the current location, fly and rod.
+
+        Needs all three set. The tables are only rebuilt (or fetched from
+        odds_for's cache) when one of them changes.
+        """
+        odds = self._odds
+        location = self.current_location
+        category = self.current_fly.category
+        weight = self.current_rod.weight
+        if (
+            odds is None
+            or odds.location != location
+            or odds.fly_category != category
+            or odds.rod_weight != weight
+        ):
+            odds = self._odds = odds_for(location, category, weight)
+        return odds
+
+    def bite_window(self, row0: int, row1: int, col0: int, col1: int) -> np.ndarray | None:
+        """Bite chance of a cast to each cell of rows row0:row1, cols col0:col1, NaN on land.
+
+        Reads only the window and the BITE_RADIUS cells around it, so the
+        display costs the same whatever the map size; bite_heatmap covers
+        the whole map. None until a location, rod and fly are set.
+        """
+        if not (self.current_location and self.current_rod and self.current_fly):
+            return None
+        odds = self.odds()
+        r = BITE_RADIUS
+        top, left = max(row0 - r, 0), max(col0 - r, 0)
+        area = self.fishfinder_grid[top:row1 + r, left:col1 + r]
+        # Boxes around the window's cells lie inside area, so its edges clamp nothing they need
+        inner = (slice(row0 - top, row1 - top), slice(col0 - left, col1 - left))
+        near = FishIndex(area == FISH).count_grid(r)[inner] > 0
+        chance = np.where(near, np.float32(odds.bite[True]), np.float32(odds.bite[False]))
+        chance[area[inner] == LAND] = np.nan
+        return chance
+
+    def bite_heatmap(self) -> np.ndarray | None:
+        """Bite chance of a cast to every cell, NaN on land.
+
+        One pass over the whole map: FishIndex.count_grid is the fish layer
+        convolved with the BITE_RADIUS box, and the odds tables turn "any fish
+        nearby" into a chance. The result is cached until the fish or the
+        setup change. None until a location, rod and fly are set.
+        """
+        if not (self.current_location and self.current_rod and self.current_fly):
+            return None
+        odds = self.odds()
+        if self.waters is not None:
+            fish_version, fish_index = self.waters.fish_index()
+        else:
+            fish_version, fish_index = self.fish_version, self.fish_index
+        key = (odds, fish_version)
+        if key != self._heatmap_key:
+            near = fish_index.count_grid(BITE_RADIUS) > 0
+            heatmap = np.where(near, np.float32(odds.bite[True]), np.float32(odds.bite[False]))
+            heatmap[self.fishfinder_grid == LAND] = np.nan
+            self._heatmap, self._heatmap_key = heatmap, key
+        return self._heatmap
 
+    def gear_snapshot(self) -> tuple:
+        """(location, rod, leader, fly) as plain values, for the replay history."""
+        rod, leader, fly = self.current_rod, self.current_leader, self.current_fly
+        return (
+            self.current_location,
+            (rod.length, rod.weight, rod.material) if rod else None,
+            (leader.material, leader.tippet, leader.length) if leader else None,
+            (fly.pattern, fly.category, fly.size) if fly else None,
+        )
+
+    def _ensure_web_defaults(self, messages: List[str]) -> None:
         # Ensure basic equipment and location; build simple defaults if needed
         if not self.current_rod:
             self.current_rod = FlyRod(9, 5, "Graphite")
@@ -443,159 +987,132 @@ class FFRPG:
             self.current_fly = Fly("Adams", "Dry Flies", 16)
             messages.append("No fly selected: tied on an Adams, size 16.")
         if not self.current_location:
-            # Default to Mountain Stream / stream type
-            self.current_location = "Mountain Stream"
-            self.generate_location("stream")
+            self.set_location("Mountain Stream")
             messages.append("No location set: heading to a Mountain Stream.")
 
+    def _cast_web(self, cast_position: str | None, result: "CastResult", phases) -> None:
+        # phases.mark() closes a timed phase; casts that stop early skip the rest
+        messages = result.messages
         messages.append("Starting to fish...")
 
         # Determine cast position
         if cast_position:
-            cast = cast_position.strip().lower()
-            if len(cast) != 2 or not cast[0].isalpha() or not cast[1].isdigit():
-                messages.append("Invalid position format. Use letter+number (e.g., b3).")
-                return "\n".join(messages)
-            col = ord(cast[0]) - ord('a')
-            row = int(cast[1]) - 1
+            position = parse_position(cast_position)
+            if position is None:
+                messages.append("Invalid position format. Use letters+number (e.g., b3).")
+                result.outcome = "invalid"
+                return
+            row, col = position
+            cast = format_position(row, col)
         else:
             # Random cast somewhere on the grid
-            col = random.randint(0, self.grid_size - 1)
-            row = random.randint(0, self.grid_size - 1)
-            cast = f"{chr(ord('a') + col)}{row + 1}"
+            col = self.rng.randint(0, self.grid_size - 1)
+            row = self.rng.randint(0, self.grid_size - 1)
+            cast = format_position(row, col)
+        result.position = cast
 
         if col < 0 or col >= self.grid_size or row < 0 or row >= self.grid_size:
             messages.append("Position out of bounds!")
-            return "\n".join(messages)
+            result.outcome = "out_of_bounds"
+            return
         
-        if self.fishfinder_grid[row][col] == '.':
+        if self.fishfinder_grid[row, col] == LAND:
             messages.append(f"You cast to {cast}, but that's dry land.")
             messages.append("Try a different spot on the water.")
-            return "\n".join(messages)
-        
-        # Show the cast on the overhead view
-        self.overhead_grid[row][col] = 'X'
+            result.outcome = "land"
+            return
+
+        if self.waters is None:
+            self._cast_at(row, col, cast, result, phases)
+        else:
+            # Other games fish this map too; hold the regions around the cast until it's over
+            with self.waters.hold(row, col):
+                self._cast_at(row, col, cast, result, phases)
+
+    def _cast_at(self, row: int, col: int, cast: str, result: "CastResult", phases) -> None:
+        messages = result.messages
+        # Show the cast on the overhead view; the splash scatters nearby fish
+        self.mark_cast(row, col)
+        self.spook_fish(row, col)
+        self.center_view(row, col)
+        result.changed_cells.append(("overhead", row, col, CELL_CHARS[CAST]))
         messages.append(f"You cast to {cast}...")
+        phases.mark("parse")
         
         # Determine if there's a bite - higher chance if fish are nearby
-        bite_chance = random.random()
-        fish_nearby = False
+        roll = self.rng.random()
         
         # Check for fish in the cast position and surrounding area
-        for dy in range(-1, 2):
-            for dx in range(-1, 2):
-                check_y, check_x = row + dy, col + dx
-                if (0 <= check_y < self.grid_size and 0 <= check_x < self.grid_size and 
-                    self.fishfinder_grid[check_y][check_x] == 'F'):
-                    fish_nearby = True
-                    break
+        fish_nearby = self.has_fish_nearby(row, col)
+        result.fish_nearby = fish_nearby
+        phases.mark("scan")
 
-        # Adjust bite chance based on equipment match and fish presence
-        base_chance = 0.4 if fish_nearby else 0.15
-        
-        # Equipment bonuses
-        if self.current_fly.category == "Dry Flies" and "Stream" in self.current_location:
-            base_chance += 0.2
-        elif self.current_fly.category == "Streamers" and "Lake" in self.current_location:
-            base_chance += 0.15
-        elif self.current_fly.category == "Nymphs":
-            base_chance += 0.1  # Nymphs work everywhere
+        # Bite chance by gear, location and fish presence
+        odds = self.odds()
+        phases.mark("odds")
         
-        if bite_chance >= base_chance:
+        if roll >= odds.bite[fish_nearby]:
             messages.append("No bites. Try casting again or change your approach.")
             if fish_nearby:
                 messages.append("Your fishfinder shows fish activity in this area!")
-            return "\n".join(messages)
+            result.outcome = "no_bite"
+            return
 
         # If we get here, fish on!
         messages.append("FISH ON!")
 
-        # Determine fish species based on location
-        fish_types = {
-            "Mountain Stream": ["Brook Trout", "Rainbow Trout", "Brown Trout"],
-            "River Bend": ["Brown Trout", "Rainbow Trout", "Smallmouth Bass"],
-            "Alpine Lake": ["Lake Trout", "Arctic Char", "Grayling"],
-            "Coastal Estuary": ["Striped Bass", "Sea-run Cutthroat", "Salmon"]
-        }
-        
-        location_fish = fish_types.get(self.current_location, ["Generic Fish"])
-        fish_species = random.choice(location_fish)
-        
-        # Determine fish size
-        min_size = 6
-        max_size = 24
-        
-        # Adjust based on rod and leader match
-        if self.current_rod.weight == 3 and "Trout" in fish_species:
-            max_size = 18  # Lighter rod better for smaller fish
-        elif self.current_rod.weight >= 7 and "Bass" in fish_species:
-            min_size = 10  # Heavier rod better for larger fish
-        
-        size = random.randint(min_size, max_size)
+        # Species by location, size by rod weight and species
+        fish_species = self.rng.choice(odds.species)
+        size = self.rng.randint(*odds.sizes[fish_species])
         messages.append(f"It's a {size}-inch {fish_species}!")
+        result.species = fish_species
+        result.size = size
+        phases.mark("rolls")
         
         # Simple automated fighting mechanic
-        fight_rounds = 3
         successful_rounds = 0
-        for _ in range(fight_rounds):
+        for _ in range(FIGHT_ROUNDS):
             # Give the player a slightly better than even chance overall
-            if random.random() < 0.65:
+            if self.rng.random() < FIGHT_ROUND_WIN_CHANCE:
                 successful_rounds += 1
+        phases.mark("fight")
         
-        if successful_rounds >= 2:
+        if successful_rounds >= ROUNDS_TO_LAND:
             messages.append(f"Success! You landed the {size}-inch {fish_species}!")
             self.player.add_catch(fish_species, size)
-            self.player.add_xp(size * 10)
+            self.player.add_xp(size * XP_PER_INCH)
+            result.outcome = "landed"
+            result.xp_gained = size * XP_PER_INCH
             # Remove fish from that position if one was there
-            if self.fishfinder_grid[row][col] == 'F':
-                self.fishfinder_grid[row][col] = '0'
+            if self.remove_fish(row, col):
+                result.changed_cells.append(("fishfinder", row, col, CELL_CHARS[WATER]))
         else:
             messages.append("The fish got away at the last moment!")
-
-        return "\n".join(messages)
+            result.outcome = "escaped"
     
     def _fish_on(self, row, col):
         print("\nFISH ON!")
         
-        # Determine fish species based on location
-        fish_types = {
-            "Mountain Stream": ["Brook Trout", "Rainbow Trout", "Brown Trout"],
-            "River Bend": ["Brown Trout", "Rainbow Trout", "Smallmouth Bass"],
-            "Alpine Lake": ["Lake Trout", "Arctic Char", "Grayling"],
-            "Coastal Estuary": ["Striped Bass", "Sea-run Cutthroat", "Salmon"]
-        }
-        
-        location_fish = fish_types.get(self.current_location, ["Generic Fish"])
-        fish_species = random.choice(location_fish)
-        
-        # Determine fish size
-        min_size = 6
-        max_size = 24
-        
-        # Adjust based on rod and leader match
-        if self.current_rod.weight == 3 and "Trout" in fish_species:
-            max_size = 18  # Lighter rod better for smaller fish
-        elif self.current_rod.weight >= 7 and "Bass" in fish_species:
-            min_size = 10  # Heavier rod better for larger fish
-        
-        size = random.randint(min_size, max_size)
+        # Species by location, size by rod weight and species
+        odds = self.odds()
+        fish_species = self.rng.choice(odds.species)
+        size = self.rng.randint(*odds.sizes[fish_species])
         
         print(f"\nIt's a {size}-inch {fish_species}!")
         
         # Simple fighting mechanic
-        fight_rounds = 3
         successful_rounds = 0
         
-        for round in range(fight_rounds):
+        for round in range(FIGHT_ROUNDS):
             print(f"\nRound {round+1} of the fight")
             print("1. Apply steady pressure")
             print("2. Give it some line")
             print("3. Pull hard")
             
-            action = input("Choose your action (1-3): ")
+            action = self.input("Choose your action (1-3): ")
             
             # Simplified logic - different actions work better for different situations
-            fish_action = random.randint(1, 3)
+            fish_action = self.rng.randint(1, 3)
             
             if (action == "1" and fish_action == 1) or \
                (action == "2" and fish_action == 3) or \
@@ -606,14 +1123,14 @@ class FFRPG:
                 print("The fish is fighting hard!")
         
         # Determine if fish is landed
-        if successful_rounds >= 2:
+        if successful_rounds >= ROUNDS_TO_LAND:
             print(f"\nSuccess! You landed the {size}-inch {fish_species}!")
             self.player.add_catch(fish_species, size)
-            self.player.add_xp(size * 10)  # XP based on fish size
+            self.player.add_xp(size * XP_PER_INCH)  # XP based on fish size
         else:
             print("\nThe fish got away at the last moment!")
         
-        input("Press Enter to continue...")
+        self.pause()
     
     def main_menu(self):
         while True:
@@ -629,8 +1146,9 @@ class FFRPG:
             print("7. Save Game")
             print("8. Load Game")
             print("9. Quit")
+            print("10. Move View")
             
-            choice = input("\nEnter choice (1-9): ")
+            choice = self.input("\nEnter choice (1-10): ")
             
             if choice == "1":
                 self.build_leader()
@@ -649,9 +1167,11 @@ class FFRPG:
             elif choice == "8":
                 self.load_game()
             elif choice == "9":
-                if input("Are you sure you want to quit? (y/n): ").lower() == 'y':
+                if self.input("Are you sure you want to quit? (y/n): ").lower() == 'y':
                     print("Thanks for playing FFRPG!")
                     break
+            elif choice == "10":
+                self.look_around()
     
     def view_catch_record(self):
         print("\nCatch Record")
@@ -662,86 +1182,81 @@ class FFRPG:
         else:
             for i, (fish, size) in enumerate(self.player.catch_record, 1):
                 print(f"{i}. {size}-inch {fish}")
+            print("-" * 30)
+            for fish, (count, best) in self.player.catch_record.species_stats().items():
+                print(f"{fish}: {count} caught, best {best}-inch")
         
-        input("\nPress Enter to continue...")
+        self.pause("\nPress Enter to continue...")
     
     def save_game(self):
         print("\nSaving game...")
         try:
-            save_data = {
-                'player': {
-                    'name': self.player.name,
-                    'level': self.player.level,
-                    'xp': self.player.xp,
-                    'catch_record': self.player.catch_record
-                },
-                'equipment': {
-                    'rod': {
-                        'length': self.current_rod.length if self.current_rod else None,
-                        'weight': self.current_rod.weight if self.current_rod else None,
-                        'material': self.current_rod.material if self.current_rod else None
-                    } if self.current_rod else None,
-                    'leader': {
-                        'material': self.current_leader.material if self.current_leader else None,
-                        'tippet': self.current_leader.tippet if self.current_leader else None,
-                        'length': self.current_leader.length if self.current_leader else None
-                    } if self.current_leader else None,
-                    'fly': {
-                        'pattern': self.current_fly.pattern if self.current_fly else None,
-                        'category': self.current_fly.category if self.current_fly else None,
-                        'size': self.current_fly.size if self.current_fly else None
-                    } if self.current_fly else None
-                },
-                'location': self.current_location
-            }
-            
-            with open('ffrpg_save.json', 'w') as f:
-                json.dump(save_data, f, indent=2)
-            
+            # Appends only what changed since the last save, down to map cells
+            codes = self._map_codes()
+            changes = None
+            if self._saved_map is not None and self._saved_map.shape == codes.shape:
+                cells = np.flatnonzero(codes != self._saved_map)
+                changes = (tuple(self.view_origin), cells, codes.reshape(-1)[cells])
+            self.journal.save(self, changes)
+            self._saved_map = codes
             print("Game saved successfully!")
         except Exception as e:
             print(f"Error saving game: {e}")
         
-        input("\nPress Enter to continue...")
+        self.pause("\nPress Enter to continue...")
+    
+    def save_data(self) -> Dict:
+        """The whole game as a JSON-friendly dict (the ffrpg_save.json format)."""
+        return {
+            'player': {
+                'name': self.player.name,
+                'level': self.player.level,
+                'xp': self.player.xp,
+                'catch_record': self.player.catch_record.to_list()
+            },
+            'equipment': {
+                'rod': {
+                    'length': self.current_rod.length,
+                    'weight': self.current_rod.weight,
+                    'material': self.current_rod.material
+                } if self.current_rod else None,
+                'leader': {
+                    'material': self.current_leader.material,
+                    'tippet': self.current_leader.tippet,
+                    'length': self.current_leader.length
+                } if self.current_leader else None,
+                'fly': {
+                    'pattern': self.current_fly.pattern,
+                    'category': self.current_fly.category,
+                    'size': self.current_fly.size
+                } if self.current_fly else None
+            },
+            'location': self.current_location,
+            'grid_size': self.grid_size,
+            'seed': self.seed,
+            # Switches this game to the saved stream too (see resume_seed)
+            'rng_seed': self.resume_seed(),
+            'map': base64.b64encode(self.map_bytes()).decode('ascii')
+        }
+    
+    def export_json(self, path: str = SAVE_JSON) -> None:
+        with open(path, 'w') as f:
+            json.dump(self.save_data(), f, indent=2)
     
     def load_game(self):
         try:
-            with open('ffrpg_save.json', 'r') as f:
-                save_data = json.load(f)
-            
-            # Load player data
-            player_data = save_data['player']
-            self.player.name = player_data['name']
-            self.player.level = player_data['level']
-            self.player.xp = player_data['xp']
-            self.player.catch_record = player_data['catch_record']
-            
-            # Load equipment
-            equipment = save_data['equipment']
-            
-            if equipment['rod']:
-                rod_data = equipment['rod']
-                self.current_rod = FlyRod(rod_data['length'], rod_data['weight'], rod_data['material'])
-            
-            if equipment['leader']:
-                leader_data = equipment['leader']
-                self.current_leader = Leader(leader_data['material'], leader_data['tippet'], leader_data['length'])
-            
-            if equipment['fly']:
-                fly_data = equipment['fly']
-                self.current_fly = Fly(fly_data['pattern'], fly_data['category'], fly_data['size'])
-            
-            # Load location
-            if save_data['location']:
-                self.current_location = save_data['location']
-                # Regenerate the location
-                location_type = "river"
-                if "Stream" in self.current_location:
-                    location_type = "stream"
-                elif "Lake" in self.current_location:
-                    location_type = "lake"
-                self.generate_location(location_type)
-            
+            journaled = os.path.exists(self.journal.path)
+            if journaled:
+                # Comes with the map file and the cell changes after it applied
+                save_data = self.journal.load()
+            else:
+                # Games saved before the journal existed are JSON only
+                with open(SAVE_JSON, 'r') as f:
+                    save_data = json.load(f)
+            exact = self.restore(save_data)
+            # The journal already holds the map it gave us
+            if exact and journaled:
+                self._saved_map = self._map_codes()
             print("Game loaded successfully!")
             return True
             
@@ -751,6 +1266,423 @@ class FFRPG:
         except Exception as e:
             print(f"Error loading game: {e}")
             return False
+    
+    def import_json(self, path: str = SAVE_JSON) -> None:
+        with open(path, 'r') as f:
+            self.restore(json.load(f))
+    
+    def restore(self, save_data: Dict) -> bool:
+        """Apply a save_data() dict; return True if its exact map was restored.
+
+        catch_record may be a pair list or a CatchLog, and map may be the
+        base64 text of a JSON save or read_map() output. Saves without a
+        usable map get a freshly generated one.
+        """
+        # Load player data
+        player_data = save_data['player']
+        self.player.name = player_data['name']
+        self.player.level = player_data['level']
+        self.player.xp = player_data['xp']
+        catch_record = player_data['catch_record']
+        if not isinstance(catch_record, CatchLog):
+            catch_record = CatchLog.from_pairs(catch_record)
+        self.player.catch_record = catch_record
+        
+        # Load equipment
+        equipment = save_data['equipment']
+        
+        if equipment['rod']:
+            rod_data = equipment['rod']
+            self.current_rod = FlyRod(rod_data['length'], rod_data['weight'], rod_data['material'])
+        
+        if equipment['leader']:
+            leader_data = equipment['leader']
+            self.current_leader = Leader(leader_data['material'], leader_data['tippet'], leader_data['length'])
+        
+        if equipment['fly']:
+            fly_data = equipment['fly']
+            self.current_fly = Fly(fly_data['pattern'], fly_data['category'], fly_data['size'])
+        
+        # The history starts over, since the loaded player state isn't in
+        # it. Old saves without a seed keep this game's
+        if save_data.get('seed') is not None:
+            self.seed = check_seed(save_data['seed'])
+        if self.history is not None:
+            self.history = []
+        # Carry on the random stream where it was saved; saves from before
+        # that was stored restart it from the seed
+        if save_data.get('rng_seed') is not None:
+            self.reseed(check_seed(save_data['rng_seed']))
+        else:
+            self.rng = random.Random(self.seed)
+
+        # Load location
+        grid_size = save_data.get('grid_size', 10)
+        if grid_size != self.grid_size:
+            self.resize(grid_size)
+        saved_map = save_data.get('map')
+        if isinstance(saved_map, str):
+            saved_map = decode_map(base64.b64decode(saved_map))
+        if saved_map is not None:
+            seed, view_origin, overhead, fish = saved_map
+            if seed == self.seed and overhead.shape == (self.grid_size, self.grid_size):
+                self.current_location = save_data['location']
+                self.restore_map(view_origin, overhead, fish)
+                return True
+        if save_data['location']:
+            # Regenerate the location
+            self.set_location(save_data['location'])
+        return False
+
+
+class FishSchool:
+    """Positions and movement state of every fish on a map, as arrays.
+
+    step() moves all fish at once: each fish that moves this tick drifts
+    one cell at random, heads for the middle of its school, or keeps
+    fleeing a cast. A fish only moves into open water that no other fish
+    holds or is moving into, so land and the one-fish-per-cell grid are
+    respected.
+    """
+
+    def __init__(self, fish_mask: np.ndarray):
+        rows, cols = np.nonzero(fish_mask)
+        self.rows = rows.astype(np.intp)
+        self.cols = cols.astype(np.intp)
+        blocks = (rows // SCHOOL_SIZE) * (fish_mask.shape[1] // SCHOOL_SIZE + 1) + cols // SCHOOL_SIZE
+        _, self.school = np.unique(blocks, return_inverse=True)
+        self.flee_rows = np.zeros(len(rows), dtype=np.intp)
+        self.flee_cols = np.zeros(len(rows), dtype=np.intp)
+        self.flee_ticks = np.zeros(len(rows), dtype=np.int8)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def _keep(self, keep: np.ndarray) -> None:
+        for name in ("rows", "cols", "school", "flee_rows", "flee_cols", "flee_ticks"):
+            setattr(self, name, getattr(self, name)[keep])
+
+    def remove(self, row: int, col: int) -> None:
+        self._keep((self.rows != row) | (self.cols != col))
+
+    def spook(self, row: int, col: int, radius: int = SPOOK_RADIUS, ticks: int = SPOOK_TICKS) -> None:
+        d_row = self.rows - row
+        d_col = self.cols - col
+        near = (np.abs(d_row) <= radius) & (np.abs(d_col) <= radius)
+        flee_rows = np.sign(d_row[near])
+        flee_cols = np.sign(d_col[near])
+        # A fish right under the splash has no "away"; send it downstream
+        flee_rows[(flee_rows == 0) & (flee_cols == 0)] = 1
+        self.flee_rows[near] = flee_rows
+        self.flee_cols[near] = flee_cols
+        self.flee_ticks[near] = ticks
+
+    def step(self, grid: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+        """Move the fish one tick, updating grid in place; returns the rows touched."""
+        count = len(self.rows)
+        if not count:
+            return np.empty(0, dtype=np.intp)
+        n_rows, n_cols = grid.shape
+
+        move_roll, pull_roll = rng.random((2, count), dtype=np.float32)
+        drift = rng.integers(-1, 2, size=(2, count), dtype=np.int8)
+
+        # Spooked fish always move, straight away from the cast
+        fleeing = self.flee_ticks > 0
+        self.flee_ticks[fleeing] -= 1
+        movers = np.flatnonzero(fleeing | (move_roll < FISH_MOVE_CHANCE))
+        rows, cols = self.rows[movers], self.cols[movers]
+        d_row, d_col = drift[0, movers], drift[1, movers]
+
+        # Schools: some movers head for their school's mean position instead
+        school = self.school
+        sizes = np.maximum(np.bincount(school), 1)
+        pull = np.flatnonzero(pull_roll[movers] < SCHOOL_PULL)
+        pulled = school[movers[pull]]
+        d_row[pull] = np.sign(np.bincount(school, weights=self.rows)[pulled] / sizes[pulled] - rows[pull])
+        d_col[pull] = np.sign(np.bincount(school, weights=self.cols)[pulled] / sizes[pulled] - cols[pull])
+
+        flee = np.flatnonzero(fleeing[movers])
+        d_row[flee] = self.flee_rows[movers[flee]]
+        d_col[flee] = self.flee_cols[movers[flee]]
+
+        to_rows = np.clip(rows + d_row, 0, n_rows - 1)
+        to_cols = np.clip(cols + d_col, 0, n_cols - 1)
+        ok = np.flatnonzero(grid[to_rows, to_cols] == WATER)
+        movers, rows, cols, to_rows, to_cols = movers[ok], rows[ok], cols[ok], to_rows[ok], to_cols[ok]
+
+        # Two fish heading for the same cell: whoever writes its claim last gets it
+        claims = self._claims(grid.shape)
+        claims[to_rows, to_cols] = movers
+        won = np.flatnonzero(claims[to_rows, to_cols] == movers)
+        movers, to_rows, to_cols = movers[won], to_rows[won], to_cols[won]
+
+        grid[rows[won], cols[won]] = WATER
+        grid[to_rows, to_cols] = FISH
+        self.rows[movers] = to_rows
+        self.cols[movers] = to_cols
+        return np.concatenate((rows[won], to_rows))
+
+    def _claims(self, shape) -> np.ndarray:
+        # Scratch grid reused every tick; stale entries are always overwritten before being read
+        claims = getattr(self, "_claim_grid", None)
+        if claims is None or claims.shape != shape:
+            claims = self._claim_grid = np.empty(shape, dtype=np.intp)
+        return claims
+
+
+class OddsEngine:
+    """Cast odds for one location, fly category and rod weight, as tables.
+
+    bite[fish_nearby] is the bite chance, species the location's fish and
+    sizes[species] the inclusive size range. Everything is worked out once
+    here from bite_chance, FISH_TYPES and size_range, so a cast only indexes.
+    """
+
+    def __init__(self, location: str, fly_category: str, rod_weight: int):
+        self.location = location
+        self.fly_category = fly_category
+        self.rod_weight = rod_weight
+        self.bite = (
+            bite_chance(False, fly_category, location),
+            bite_chance(True, fly_category, location),
+        )
+        self.species = tuple(FISH_TYPES.get(location, ["Generic Fish"]))
+        self.sizes = {name: size_range(rod_weight, name) for name in self.species}
+
+
+class CastResult:
+    """What happened on one cast made through FFRPG.cast_web.
+
+    outcome is one of "invalid", "out_of_bounds", "land", "no_bite",
+    "escaped" or "landed". changed_cells lists (grid, row, col, char)
+    for every cell the cast rewrote.
+    """
+
+    def __init__(self):
+        self.position: str | None = None
+        self.outcome = "invalid"
+        self.fish_nearby = False
+        self.species: str | None = None
+        self.size: int | None = None
+        self.xp_gained = 0
+        self.changed_cells: List[Tuple[str, int, int, str]] = []
+        self.messages: List[str] = []
+
+    @property
+    def bite(self) -> bool:
+        return self.outcome in ("escaped", "landed")
+
+    @property
+    def landed(self) -> bool:
+        return self.outcome == "landed"
+
+    @property
+    def message(self) -> str:
+        if not metrics.enabled:
+            return "\n".join(self.messages)
+        start = perf_counter()
+        message = "\n".join(self.messages)
+        metrics.observe("cast.messages", perf_counter() - start)
+        return message
+
+    def to_dict(self) -> Dict:
+        return {
+            "position": self.position,
+            "outcome": self.outcome,
+            "bite": self.bite,
+            "landed": self.landed,
+            "fish_nearby": self.fish_nearby,
+            "species": self.species,
+            "size": self.size,
+            "xp_gained": self.xp_gained,
+            "changed_cells": [
+                {"grid": grid, "cell": format_position(row, col), "value": value}
+                for grid, row, col, value in self.changed_cells
+            ],
+            "message": self.message,
+        }
+
+
+class GridRenderer:
+    """Builds the display_game text, caching whatever hasn't changed.
+
+    Each map row is rendered once (fishfinder and overhead side by side,
+    plus the bite odds once gear and a location are set) and reused until
+    mark_dirty() drops it, so redrawing after a cast only formats the rows
+    it changed. The player/equipment header is rebuilt only when one of the
+    fields it shows changes.
+    """
+
+    BANNER = "\n".join([
+        "#" * 83,
+        " " * 32 + "FFRPG:FlyFlishingRPG",
+        "#" * 83,
+    ])
+    GRID_TITLES = "\n".join([
+        "-" * 83,
+        "---------------fishfinder----------------|---------------OverHead--------------------",
+        " " * 40 + "|",
+    ])
+    # GRID_TITLES widened for the third grid
+    ODDS_TITLES = "\n".join([
+        "-" * 130,
+        "---------------fishfinder----------------|---------------OverHead".ljust(90, "-") +
+        "|-----------BiteOdds (tenths)-----------",
+        (" " * 40 + "|").ljust(90) + "|",
+    ])
+    # Odds cells: a digit per tenth of bite chance, '.' on land
+    ODDS_CHARS = "0123456789."
+    FOOTER = "\n" + "#" * 83
+
+    def __init__(self, game: "FFRPG"):
+        self.game = game
+        # Draw the bite odds grid when the game can compute it
+        self.show_odds = True
+        self._odds = None
+        # Odds cell codes for the visible window, and the (odds, fish version,
+        # row0, col0) they were built from
+        self._tenths: List[List[int]] = []
+        self._tenths_key = None
+        self._header_key = None
+        self._header = ""
+        self._columns = None
+        self._column_header = ""
+        self._cells: List[str] = []
+        self._rows: Dict[int, str] = {}
+        # Region versions of shared waters as of the cached rows
+        self._waters_seen = None
+
+    def mark_dirty(self, row: int) -> None:
+        self._rows.pop(row, None)
+
+    def invalidate(self) -> None:
+        """Forget everything, e.g. after a new map has been generated."""
+        self._rows.clear()
+        self._columns = None
+        self._header_key = None
+        self._waters_seen = None
+
+    def render(self) -> str:
+        game = self.game
+        set_up = game.current_location and game.current_rod and game.current_fly
+        # Fish changes mark their own rows dirty; a new setup changes every row
+        odds = game.odds() if self.show_odds and set_up else None
+        if odds is not self._odds:
+            self._odds = odds
+            self.invalidate()
+
+        row0, row1, col0, col1 = game.visible_window()
+        if self._columns != (col0, col1):
+            self._set_columns(col0, col1)
+        if odds is not None:
+            key = (odds, self._fish_version(row0, row1, col0, col1), row0, col0)
+            if key != self._tenths_key:
+                self._set_tenths(row0, row1, col0, col1)
+                self._tenths_key = key
+        if game.waters is not None:
+            self._sync_waters(game.waters, row0, row1, col0, col1)
+
+        rows = self._rows
+        body = []
+        for y in range(row0, row1):
+            line = rows.get(y)
+            if line is None:
+                line = rows[y] = self._render_row(y)
+            body.append(line)
+
+        return "\n".join([self._player_header(), self._column_header, *body, self.FOOTER])
+
+    def _sync_waters(self, waters, row0: int, row1: int, col0: int, col1: int) -> None:
+        # Other games write to shared waters without telling this renderer, so
+        # compare region versions band by band and redraw the bands that moved
+        size = waters.region_size
+        band0 = (row0 // size, col0)
+        bands = waters.versions[row0 // size:(row1 - 1) // size + 1, col0 // size:(col1 - 1) // size + 1]
+        totals = bands.sum(axis=1).tolist()
+        seen = self._waters_seen
+        self._waters_seen = (waters, band0, totals)
+        if seen is None or seen[0] is not waters or seen[1] != band0:
+            self._rows.clear()
+            return
+        for i, (old, new) in enumerate(zip(seen[2], totals)):
+            if old != new:
+                top = (band0[0] + i) * size
+                # Fish changes shift the odds up to BITE_RADIUS rows outside the band
+                for y in range(top - BITE_RADIUS, top + size + BITE_RADIUS):
+                    self.mark_dirty(y)
+
+    def _player_header(self) -> str:
+        game = self.game
+        player = game.player
+        # Gear objects are replaced rather than mutated, so identity is enough
+        key = (
+            player.name, player.level, player.xp, len(player.catch_record),
+            game.current_rod, game.current_leader, game.current_fly, game.current_location,
+        )
+        if key != self._header_key:
+            self._header_key = key
+            titles = self.GRID_TITLES if self._odds is None else self.ODDS_TITLES
+            self._header = "\n".join([
+                self.BANNER,
+                f"Fisherman: {player.name}" + " " * 10 +
+                f"Flyrod: {game.current_rod or ''}" + " " * 18 +
+                f"Fly: {game.current_fly or ''}",
+                f"lvl: {player.level} xp: {player.xp:06d} total fish: {len(player.catch_record)}" + " " * 6 +
+                f"Leader: {game.current_leader or ''}" + " " * 18 +
+                f"Location: {game.current_location or ''}",
+                titles,
+            ])
+        return self._header
+
+    def _set_columns(self, col0: int, col1: int) -> None:
+        # Column labels; cells widen if the labels need more than two letters
+        labels = [column_label(x) for x in range(col0, col1)]
+        cell_width = max(3, max(len(label) for label in labels) + 1)
+        header = "".join(label.ljust(cell_width) for label in labels).rstrip()
+        self._column_header = f"      {header}       |            {header}"
+        if self._odds is not None:
+            # Rows keep the trailing padding the header strips
+            gap = " " * (len(labels) * cell_width - len(header) + 6)
+            self._column_header += f"{gap}|            {header}"
+        self._cells = [ch.ljust(cell_width) for ch in CELL_CHARS]
+        self._odds_cells = [ch.ljust(cell_width) for ch in self.ODDS_CHARS]
+        self._columns = (col0, col1)
+        self._rows.clear()
+
+    def _render_row(self, y: int) -> str:
+        game = self.game
+        col0, col1 = self._columns
+        cells = self._cells
+        # Left grid (fishfinder), then right grid (overhead)
+        left_row = "".join([cells[v] for v in game.fishfinder_grid[y, col0:col1].tolist()])
+        right_row = "".join([cells[v] for v in game.overhead_grid[y, col0:col1].tolist()])
+        line = f"{y+1:>5} {left_row}      |{y+1:>11} {right_row}"
+        if self._odds is not None:
+            odds_cells = self._odds_cells
+            tenths = self._tenths[y - self._tenths_key[2]]
+            line += f"      |{y+1:>11} " + "".join([odds_cells[v] for v in tenths])
+        return line
+
+    def _fish_version(self, row0: int, row1: int, col0: int, col1: int) -> int:
+        # Changes whenever fish near the window may have changed
+        waters = self.game.waters
+        if waters is None:
+            return self.game.fish_version
+        size, r = waters.region_size, BITE_RADIUS
+        near = waters.versions[
+            max(row0 - r, 0) // size:(row1 - 1 + r) // size + 1,
+            max(col0 - r, 0) // size:(col1 - 1 + r) // size + 1,
+        ]
+        return int(near.sum())
+
+    def _set_tenths(self, row0: int, row1: int, col0: int, col1: int) -> None:
+        odds = self.game.bite_window(row0, row1, col0, col1)
+        land = np.isnan(odds)
+        # The epsilon keeps float32 values like 0.7 from flooring to 6
+        tenths = np.minimum(np.floor(np.where(land, 0, odds) * 10 + 1e-4), 9).astype(np.intp)
+        tenths[land] = len(self.ODDS_CHARS) - 1
+        self._tenths = tenths.tolist()
 
 
 class Player:
@@ -758,10 +1690,10 @@ class Player:
         self.name = name
         self.level = level
         self.xp = xp
-        self.catch_record = []  # List of (species, size) tuples
+        self.catch_record = CatchLog()  # (species, size) pairs plus running totals
     
     def add_catch(self, species, size):
-        self.catch_record.append((species, size))
+        self.catch_record.append(species, size)
     
     def add_xp(self, amount):
         self.xp += amount
@@ -804,5 +1736,12 @@ class Fly:
 
 
 if __name__ == "__main__":
+    from location_pool import LocationPool
+
     game = FFRPG()
-    game.main_menu()
+    game.location_pool = LocationPool(game.grid_size, depth=1).start()
+    try:
+        game.main_menu()
+    finally:
+        if game.terminal is not None:
+            game.terminal.close()
@@ -0,0 +1,98 @@
+"""Bit-packed map files.
+
+A map is stored as its overhead grid at 2 bits per cell (every overhead
+code fits in 2 bits) plus a 1-bit-per-cell fish bitmap, after a fixed
+header:
+
+    magic, u32 grid size, u64 seed, u32 view row, u32 view col
+    ceil(n*n / 4) bytes of overhead codes, four cells per byte, first cell high
+    ceil(n*n / 8) bytes of fish bitmap (np.packbits order)
+
+The fishfinder grid is the overhead land plus the fish, so nothing else is
+needed. A 2000x2000 map takes about 1.5 MB. read_map() memory-maps the
+file and decodes it from a single np.frombuffer view, without copying the
+file into Python first.
+"""
+import mmap
+import os
+import struct
+import zlib
+from typing import Tuple
+
+import numpy as np
+
+
+MAGIC = b"FFRM\x01"
+HEADER = struct.Struct("<5sIQII")
+# The header stores the seed as a u64
+MAX_SEED = (1 << 64) - 1
+
+
+def check_seed(seed) -> int:
+    """Return seed if the header can store it; raise ValueError if not."""
+    if not isinstance(seed, int) or isinstance(seed, bool) or not 0 <= seed <= MAX_SEED:
+        raise ValueError(f"seed must be an integer from 0 to {MAX_SEED}, not {seed!r}")
+    return seed
+
+
+def encode_map(overhead: np.ndarray, fish: np.ndarray, seed: int, view_origin: Tuple[int, int]) -> bytes:
+    """Pack an overhead code grid and a boolean fish mask of the same square shape."""
+    n = overhead.shape[0]
+    codes = overhead.reshape(-1)
+    pad = -codes.size % 4
+    if pad:
+        codes = np.concatenate((codes, np.zeros(pad, dtype=np.uint8)))
+    quads = codes.reshape(-1, 4)
+    terrain = (quads[:, 0] << 6) | (quads[:, 1] << 4) | (quads[:, 2] << 2) | quads[:, 3]
+    return b"".join((
+        HEADER.pack(MAGIC, n, check_seed(seed), *view_origin),
+        terrain.astype(np.uint8).tobytes(),
+        np.packbits(fish.reshape(-1)).tobytes(),
+    ))
+
+
+def decode_map(buffer) -> Tuple[int, Tuple[int, int], np.ndarray, np.ndarray]:
+    """Return (seed, view_origin, overhead, fish) from encode_map output.
+
+    The arrays are fresh copies, so buffer can be released afterwards.
+    """
+    if len(buffer) < HEADER.size:
+        raise ValueError("map data is truncated")
+    magic, n, seed, row, col = HEADER.unpack_from(buffer)
+    if magic != MAGIC:
+        raise ValueError("not an FFRPG map")
+    cells = n * n
+    terrain_bytes = (cells + 3) // 4
+    fish_bytes = (cells + 7) // 8
+    if len(buffer) < HEADER.size + terrain_bytes + fish_bytes:
+        raise ValueError("map data is truncated")
+
+    data = np.frombuffer(buffer, dtype=np.uint8, count=terrain_bytes + fish_bytes, offset=HEADER.size)
+    terrain = data[:terrain_bytes]
+    quads = np.empty((terrain_bytes, 4), dtype=np.uint8)
+    quads[:, 0] = terrain >> 6
+    quads[:, 1] = (terrain >> 4) & 3
+    quads[:, 2] = (terrain >> 2) & 3
+    quads[:, 3] = terrain & 3
+    overhead = quads.reshape(-1)[:cells].reshape(n, n)
+    fish = np.unpackbits(data[terrain_bytes:], count=cells).reshape(n, n).astype(bool)
+    return seed, (row, col), overhead, fish
+
+
+def write_map(path: str, data: bytes) -> None:
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def read_map(path: str, crc: int | None = None) -> Tuple[int, Tuple[int, int], np.ndarray, np.ndarray] | None:
+    """decode_map() output for the file at path.
+
+    With crc, returns None unless the file's crc32 matches: the file then
+    belongs to some other save.
+    """
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+        if crc is not None and zlib.crc32(view) != crc:
+            return None
+        return decode_map(view)
@@ -0,0 +1,194 @@
+"""Low-overhead counters and latency histograms.
+
+Instrumentation is off unless FFRPG_METRICS=1 is set (or enable() is
+called). While it's off, phases() hands out a shared do-nothing timer and
+incr()/observe() return straight away, so instrumented code pays for a
+method call and nothing else.
+
+Histograms use fixed power-of-two buckets from 1 us to about 16 s, so
+recording is a bisect and an increment. Percentiles are read off the
+bucket bounds and are therefore upper estimates. The overflow bucket
+past 16 s has no upper bound: snapshots give its bound, and any
+percentile that lands in it, as None, which /metrics sends as null.
+Counters also keep a 60-slot ring of per-second counts for recent rates.
+"""
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, List
+
+perf_counter = time.perf_counter
+
+# Bucket upper bounds in seconds: 1us, 2us, 4us ... ~16.8s, then overflow
+BUCKET_BOUNDS: List[float] = [1e-6 * 2 ** k for k in range(25)]
+
+RATE_WINDOW = 60
+
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect_left(BUCKET_BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+
+    def percentile(self, q: float) -> float | None:
+        """Upper bound of the bucket holding quantile q; None past the last bound."""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for bound, count in zip(BUCKET_BOUNDS, self.counts):
+            seen += count
+            if seen >= target:
+                return bound
+        return None
+
+    def snapshot(self) -> Dict:
+        ms = 1000.0
+
+        def to_ms(seconds):
+            return None if seconds is None else seconds * ms
+
+        return {
+            "count": self.count,
+            "sum_ms": self.total * ms,
+            "mean_ms": self.total / self.count * ms if self.count else 0.0,
+            "p50_ms": to_ms(self.percentile(0.50)),
+            "p95_ms": to_ms(self.percentile(0.95)),
+            "p99_ms": to_ms(self.percentile(0.99)),
+            "buckets": [
+                [to_ms(bound), count]
+                for bound, count in zip(BUCKET_BOUNDS + [None], self.counts)
+                if count
+            ],
+        }
+
+
+class Counter:
+    def __init__(self):
+        self.total = 0
+        self._slots = [0] * RATE_WINDOW
+        self._second = int(time.monotonic())
+
+    def _advance(self, second: int) -> None:
+        # Zero the slots for any whole seconds that passed without increments
+        gap = second - self._second
+        if gap > 0:
+            for s in range(self._second + 1, self._second + 1 + min(gap, RATE_WINDOW)):
+                self._slots[s % RATE_WINDOW] = 0
+            self._second = second
+
+    def incr(self, n: int = 1) -> None:
+        self._advance(int(time.monotonic()))
+        self.total += n
+        self._slots[self._second % RATE_WINDOW] += n
+
+    def rate(self) -> float:
+        """Average per second over the last RATE_WINDOW seconds."""
+        self._advance(int(time.monotonic()))
+        return sum(self._slots) / RATE_WINDOW
+
+
+class _PhaseTimer:
+    """Times consecutive phases of one operation; each mark() ends a phase."""
+
+    __slots__ = ("_metrics", "_prefix", "_start", "_last")
+
+    def __init__(self, metrics: "Metrics", prefix: str):
+        self._metrics = metrics
+        self._prefix = prefix
+        self._start = self._last = perf_counter()
+
+    def mark(self, phase: str) -> None:
+        now = perf_counter()
+        self._metrics.observe(f"{self._prefix}.{phase}", now - self._last)
+        self._last = now
+
+    def finish(self) -> None:
+        self._metrics.observe(f"{self._prefix}.total", perf_counter() - self._start)
+
+
+class _NullPhaseTimer:
+    __slots__ = ()
+
+    def mark(self, phase: str) -> None:
+        pass
+
+    def finish(self) -> None:
+        pass
+
+
+NULL_PHASES = _NullPhaseTimer()
+
+
+class Metrics:
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.started = time.monotonic()
+        self._histograms: Dict[str, Histogram] = {}
+        self._counters: Dict[str, Counter] = {}
+        self._lock = threading.Lock()
+
+    def enable(self) -> None:
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+            self.started = time.monotonic()
+
+    def phases(self, prefix: str):
+        """Return a timer whose mark(name) records '<prefix>.<name>' latencies."""
+        if not self.enabled:
+            return NULL_PHASES
+        return _PhaseTimer(self, prefix)
+
+    def observe(self, name: str, seconds: float) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram()
+            histogram.observe(seconds)
+
+    def incr(self, name: str, n: int = 1) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            counter = self._counters.get(name)
+            if counter is None:
+                counter = self._counters[name] = Counter()
+            counter.incr(n)
+
+    def count(self, name: str) -> int:
+        counter = self._counters.get(name)
+        return counter.total if counter else 0
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            uptime = time.monotonic() - self.started
+            casts = self.count("casts")
+            cast_counter = self._counters.get("casts")
+            return {
+                "enabled": self.enabled,
+                "uptime_s": uptime,
+                "casts_per_second": cast_counter.rate() if cast_counter else 0.0,
+                "casts_per_second_lifetime": casts / uptime if uptime else 0.0,
+                "catch_ratio": self.count("casts.landed") / casts if casts else 0.0,
+                "counters": {name: c.total for name, c in sorted(self._counters.items())},
+                "histograms": {name: h.snapshot() for name, h in sorted(self._histograms.items())},
+            }
+
+
+metrics = Metrics(enabled=os.environ.get("FFRPG_METRICS") == "1")
@@ -0,0 +1,260 @@
+"""Rank every rod/leader/fly/location setup by expected XP per cast.
+
+The full gear space (every option list in main.py times the four
+locations) has millions of setups, but the cast rules only look at a few
+fields of them. odds_signature() runs the same rule helpers as cast_web
+with the gear wrapped in recorders. That finds which fields are actually
+read, and only those fields are enumerated. Every other field just
+multiplies the size of an equivalence class, and classes with identical
+odds are merged. Expected values are exact given the rules, apart from how
+often a cast on water has a fish nearby. That rate is measured per terrain
+type over sampled maps, one process per terrain type.
+
+    python optimize.py --top 15
+"""
+import argparse
+import itertools
+import json
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List
+
+import numpy as np
+
+from main import (
+    FIGHT_ROUND_WIN_CHANCE,
+    FIGHT_ROUNDS,
+    FLY_PATTERNS,
+    FLY_SIZES,
+    LEADER_DIAMETERS,
+    LEADER_LENGTHS,
+    LEADER_LINE_TYPES,
+    LOCATIONS,
+    PATTERN_TO_CATEGORY,
+    ROD_LENGTHS,
+    ROD_MATERIALS,
+    ROD_WEIGHTS,
+    ROUNDS_TO_LAND,
+    XP_PER_INCH,
+    Fly,
+    FlyRod,
+    Leader,
+    location_type_for,
+    odds_for,
+)
+from simulate import nearby_fractions
+
+
+# Every independently chosen field of a setup, in report order
+FIELDS = {
+    "location": LOCATIONS,
+    "rod_length": ROD_LENGTHS,
+    "rod_weight": ROD_WEIGHTS,
+    "rod_material": ROD_MATERIALS,
+    "leader_material": LEADER_LINE_TYPES,
+    "leader_tippet": LEADER_DIAMETERS,
+    "leader_length": LEADER_LENGTHS,
+    "fly_pattern": [p for patterns in FLY_PATTERNS.values() for p in patterns],
+    "fly_size": FLY_SIZES,
+}
+
+# Gear attribute -> the field that determines it (a fly's category comes from its pattern)
+ATTRIBUTE_FIELDS = {
+    ("rod", "length"): "rod_length",
+    ("rod", "weight"): "rod_weight",
+    ("rod", "material"): "rod_material",
+    ("leader", "material"): "leader_material",
+    ("leader", "tippet"): "leader_tippet",
+    ("leader", "length"): "leader_length",
+    ("fly", "pattern"): "fly_pattern",
+    ("fly", "category"): "fly_pattern",
+    ("fly", "size"): "fly_size",
+}
+
+DEFAULTS = {name: values[0] for name, values in FIELDS.items()}
+
+
+def odds_signature(location: str, rod: FlyRod, leader: Leader, fly: Fly) -> tuple:
+    """Everything the cast rules derive from a setup.
+
+    Two setups with the same signature have identical odds. This must key
+    odds_for on the same gear attributes FFRPG.odds does.
+    """
+    odds = odds_for(location, fly.category, rod.weight)
+    return (
+        location_type_for(location),
+        odds.bite[True],
+        odds.bite[False],
+        tuple(sorted(odds.sizes.values())),
+    )
+
+
+class _Recorder:
+    """Stands in for a gear object and notes which attributes get read."""
+
+    def __init__(self, kind: str, gear, reads: set):
+        self._kind = kind
+        self._gear = gear
+        self._reads = reads
+
+    def __getattr__(self, attr):
+        self._reads.add(ATTRIBUTE_FIELDS[(self._kind, attr)])
+        return getattr(self._gear, attr)
+
+
+def _build_gear(values: Dict, reads: set):
+    rod = FlyRod(values["rod_length"], values["rod_weight"], values["rod_material"])
+    leader = Leader(values["leader_material"], values["leader_tippet"], values["leader_length"])
+    pattern = values["fly_pattern"]
+    fly = Fly(pattern, PATTERN_TO_CATEGORY[pattern], values["fly_size"])
+    return (
+        _Recorder("rod", rod, reads),
+        _Recorder("leader", leader, reads),
+        _Recorder("fly", fly, reads),
+    )
+
+
+def relevant_fields() -> List[str]:
+    """Fields that odds_signature reads for at least one setup.
+
+    Enumerates the fields known to matter so far and restarts whenever a
+    setup reads a new one. Since the signature is deterministic, every
+    setup then follows one of the explored paths, and no field outside
+    the result can change the odds.
+    """
+    relevant = ["location"]
+    while True:
+        reads = set()
+        for combo in itertools.product(*(FIELDS[name] for name in relevant)):
+            values = {**DEFAULTS, **dict(zip(relevant, combo))}
+            odds_signature(values["location"], *_build_gear(values, reads))
+            if not reads <= set(relevant):
+                break
+        else:
+            return relevant
+        relevant = [name for name in FIELDS if name in reads or name in relevant]
+
+
+def landing_chance() -> float:
+    """P(winning at least ROUNDS_TO_LAND of FIGHT_ROUNDS)."""
+    p = FIGHT_ROUND_WIN_CHANCE
+    return sum(
+        math.comb(FIGHT_ROUNDS, k) * p ** k * (1 - p) ** (FIGHT_ROUNDS - k)
+        for k in range(ROUNDS_TO_LAND, FIGHT_ROUNDS + 1)
+    )
+
+
+def _nearby_rate(job) -> float:
+    location, grid_size, maps, seed = job
+    return float(nearby_fractions(location, grid_size, maps, seed).mean())
+
+
+class SetupClass:
+    """A group of setups with identical odds."""
+
+    def __init__(self, signature: tuple):
+        self.signature = signature
+        self.setups = 0
+        self.values: Dict[str, set] = {}
+        self.bite_rate = 0.0
+        self.catch_rate = 0.0
+        self.xp_per_cast = 0.0
+
+    def describe(self, relevant: List[str]) -> Dict:
+        fields = {}
+        for name, options in FIELDS.items():
+            present = self.values.get(name)
+            if name not in relevant or len(present) == len(options):
+                fields[name] = "any"
+            else:
+                fields[name] = [v for v in options if v in present]
+        return fields
+
+    def to_dict(self, relevant: List[str]) -> Dict:
+        return {
+            "xp_per_cast": self.xp_per_cast,
+            "catch_rate": self.catch_rate,
+            "bite_rate": self.bite_rate,
+            "setups": self.setups,
+            "fields": self.describe(relevant),
+        }
+
+
+def optimize(grid_size: int = 10, maps: int = 2000, seed: int = 0, workers: int | None = None):
+    """Return (relevant fields, SetupClasses ranked best first)."""
+    relevant = relevant_fields()
+    others = math.prod(len(v) for name, v in FIELDS.items() if name not in relevant)
+
+    classes: Dict[tuple, SetupClass] = {}
+    for combo in itertools.product(*(FIELDS[name] for name in relevant)):
+        values = {**DEFAULTS, **dict(zip(relevant, combo))}
+        signature = odds_signature(values["location"], *_build_gear(values, set()))
+        entry = classes.get(signature)
+        if entry is None:
+            entry = classes[signature] = SetupClass(signature)
+        entry.setups += others
+        for name, value in zip(relevant, combo):
+            entry.values.setdefault(name, set()).add(value)
+
+    # How often a water cast has fish nearby depends only on the terrain type
+    terrain_types = sorted({signature[0] for signature in classes})
+    seeds = np.random.SeedSequence(seed).generate_state(len(terrain_types))
+    samples = {t: next(l for l in LOCATIONS if location_type_for(l) == t) for t in terrain_types}
+    jobs = [(samples[t], grid_size, maps, int(s)) for t, s in zip(terrain_types, seeds)]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        rates = [_nearby_rate(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            rates = list(pool.map(_nearby_rate, jobs))
+    near_rate = dict(zip(terrain_types, rates))
+
+    land = landing_chance()
+    for entry in classes.values():
+        terrain, near_chance, far_chance, sizes = entry.signature
+        p_near = near_rate[terrain]
+        entry.bite_rate = p_near * near_chance + (1 - p_near) * far_chance
+        entry.catch_rate = entry.bite_rate * land
+        mean_size = sum((low + high) / 2 for low, high in sizes) / len(sizes)
+        entry.xp_per_cast = entry.catch_rate * mean_size * XP_PER_INCH
+
+    ranked = sorted(classes.values(), key=lambda e: (-e.xp_per_cast, -e.catch_rate))
+    return relevant, ranked
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rank every FFRPG setup by expected XP per cast")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--grid-size", type=int, default=10)
+    parser.add_argument("--maps", type=int, default=2000, help="maps sampled per terrain type")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    relevant, ranked = optimize(args.grid_size, args.maps, args.seed, args.workers)
+    total = sum(entry.setups for entry in ranked)
+
+    if args.json:
+        print(json.dumps({
+            "setups": total,
+            "classes": len(ranked),
+            "relevant_fields": relevant,
+            "ranked": [entry.to_dict(relevant) for entry in ranked[:args.top]],
+        }, indent=2))
+        return
+
+    print(f"{total:,} setups in {len(ranked)} classes; odds depend on: {', '.join(relevant)}")
+    for i, entry in enumerate(ranked[:args.top], 1):
+        print(
+            f"\n{i:>3}. {entry.xp_per_cast:7.3f} XP/cast  catch {entry.catch_rate:.4f}  "
+            f"bite {entry.bite_rate:.4f}  ({entry.setups:,} setups)"
+        )
+        for name, value in entry.describe(relevant).items():
+            if value != "any":
+                print(f"       {name}: {', '.join(map(str, value))}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Record and deterministically replay games.
+
+Every FFRPG draws its randomness from its own seeded generator and keeps
+a history of the map generations, fish movement ticks, casts and reseeds
+(one per save) it has made. The seed plus that history rebuilds the game
+exactly: replaying it regenerates the same maps, moves the fish the same
+way, and every cast lands on the same outcome, species and size. That makes a recorded
+session a fixed workload for benchmarks and balance comparisons.
+
+Casts made through the interactive console (start_fishing) depend on the
+fight choices typed at the prompt, so a history containing one can't be
+replayed.
+
+    python replay.py recording.json --repeat 5
+"""
+import argparse
+import json
+import time
+from typing import Dict, List, Tuple
+
+from main import FFRPG, CastResult, Fly, FlyRod, Leader
+
+
+RECORD_VERSION = 1
+
+
+class ReplayMismatch(Exception):
+    """A replayed cast came out differently from the recording."""
+
+
+def export_record(game: FFRPG) -> Dict:
+    """Return a JSON-friendly recording of game."""
+    if game.history is None:
+        raise ValueError(
+            "this game has no replayable history "
+            "(record=False, a map loaded from a save, or shared waters)"
+        )
+    return {
+        "version": RECORD_VERSION,
+        "seed": game.seed,
+        "grid_size": game.grid_size,
+        "history": [list(entry) for entry in game.history],
+    }
+
+
+def replay(record: Dict, verify: bool = True) -> Tuple[FFRPG, List[CastResult]]:
+    """Re-execute a recording on a fresh game and return it with its cast results.
+
+    With verify, raises ReplayMismatch as soon as a cast differs from the
+    recorded outcome.
+    """
+    if record.get("version") != RECORD_VERSION:
+        raise ValueError(f"unsupported recording version: {record.get('version')}")
+
+    game = FFRPG(record["grid_size"], seed=record["seed"])
+    # Fish only move where the recording says they did
+    game.fish_tick_seconds = None
+    results = []
+    for i, entry in enumerate(record["history"]):
+        action = entry[0]
+        if action == "generate":
+            # Maps taken from a LocationPool carry their own seed
+            game.generate_location(*entry[1:])
+        elif action == "cast":
+            _, position, location, rod, leader, fly, outcome, species, size = entry
+            game.current_location = location
+            game.current_rod = FlyRod(*rod) if rod else None
+            game.current_leader = Leader(*leader) if leader else None
+            game.current_fly = Fly(*fly) if fly else None
+            result = game.cast_web(position)
+            if verify and (result.outcome, result.species, result.size) != (outcome, species, size):
+                raise ReplayMismatch(
+                    f"entry {i}: expected {outcome} {species} {size}, "
+                    f"got {result.outcome} {result.species} {result.size}"
+                )
+            results.append(result)
+        elif action == "tick":
+            game.advance_fish(entry[1])
+        elif action == "reseed":
+            game.reseed(entry[1])
+        elif action == "console_cast":
+            raise ValueError(f"entry {i} is an interactive console cast and can't be replayed")
+        else:
+            raise ValueError(f"entry {i}: unknown action {action!r}")
+    return game, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded FFRPG game")
+    parser.add_argument("recording", help="JSON file written from export_record or /api/replay")
+    parser.add_argument("--repeat", type=int, default=1, help="replay this many times and report timing")
+    parser.add_argument("--no-verify", action="store_true", help="don't compare against recorded outcomes")
+    args = parser.parse_args()
+
+    with open(args.recording, "r", encoding="utf-8") as f:
+        record = json.load(f)
+
+    timings = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        game, results = replay(record, verify=not args.no_verify)
+        timings.append(time.perf_counter() - start)
+
+    landed = sum(result.landed for result in results)
+    print(f"seed {record['seed']}: {len(results)} casts, {landed} fish, {game.player.xp} XP")
+    print(f"replay time: best {min(timings) * 1000:.2f} ms, mean {sum(timings) / len(timings) * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
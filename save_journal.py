@@ -0,0 +1,460 @@
+"""Append-only binary save file.
+
+ffrpg_save.journal starts with a magic header and then holds a sequence of
+records, each framed as
+
+    <u32 body length> <u32 crc32 of body> <body: u8 record type, payload>
+
+The first record is always a snapshot of the whole game. Every later save
+appends only what changed since the previous one: player, equipment,
+newly seen species, one 4-byte record per new catch, the seed the random
+stream resumes from, and the map cells that changed. Once snapshot_every
+records have piled up behind the snapshot, the next save rewrites the
+file as a single fresh snapshot.
+
+The map itself lives in a separate bit-packed file (see map_codec), whose
+crc32 the snapshot records. That file is only rewritten together with a
+snapshot, so a cast or a fish tick costs 5 bytes per changed cell rather
+than a whole map. A new map also takes a snapshot, and so do cell records
+that add up to more than the map file.
+
+A torn final record (a crash mid-append) fails its length or CRC check.
+Loading stops there, and the next save overwrites it.
+
+The JSON save format remains the import/export path:
+
+    python save_journal.py export ffrpg_save.journal ffrpg_save.json
+    python save_journal.py import ffrpg_save.json ffrpg_save.journal
+"""
+import argparse
+import json
+import os
+import random
+import struct
+import sys
+import zlib
+from array import array
+from typing import Dict, List
+
+import numpy as np
+
+from catch_log import SPECIES_NAMES, CatchLog, species_id
+from map_codec import HEADER as MAP_HEADER, check_seed, read_map, write_map
+
+
+MAGIC = b"FFRJ\x01"
+
+FRAME = struct.Struct("<II")         # body length, crc32 of body
+PLAYER = struct.Struct("<IQ")        # level, xp; the name follows
+SPECIES = struct.Struct("<H")        # file species id; the name follows
+CATCH = struct.Struct("<HH")         # file species id, size
+RNG = struct.Struct("<Q")            # seed the game's random stream resumes from
+MAP_HEAD = struct.Struct("<III")     # view row, view col, cell count; the cells follow
+# A changed map cell: its u32 index in the flattened grid plus a u8 code (below)
+MAP_CELL_BYTES = 5
+SNAPSHOT_HEAD = struct.Struct("<I")  # JSON header length; the catch columns follow it
+
+# Record types
+(SNAPSHOT, PLAYER_EVENT, EQUIPMENT_EVENT, SPECIES_EVENT, CATCH_EVENT, RNG_EVENT,
+ MAP_EVENT) = range(1, 8)
+
+# Records appended after a snapshot before the file is compacted
+SNAPSHOT_EVERY = 4096
+
+
+class JournalError(Exception):
+    """The file isn't a save journal, or its snapshot is unreadable."""
+
+
+def _column_bytes(column: array) -> bytes:
+    # Columns are stored little-endian whatever the host byte order
+    if sys.byteorder == "big":
+        column = array(column.typecode, column)
+        column.byteswap()
+    return column.tobytes()
+
+
+def _column_from(data: bytes) -> array:
+    column = array("H")
+    column.frombytes(data)
+    if sys.byteorder == "big":
+        column.byteswap()
+    return column
+
+
+def _frame(kind: int, payload: bytes) -> bytes:
+    body = bytes((kind,)) + payload
+    return FRAME.pack(len(body), zlib.crc32(body)) + body
+
+
+def map_codes(overhead: np.ndarray, fish: np.ndarray) -> np.ndarray:
+    """One code per cell, as MAP_EVENT stores them: the overhead code, plus 4 for a fish."""
+    return overhead | (fish.astype(np.uint8) << 2)
+
+
+def _apply_cells(saved_map, origin: tuple, cells: np.ndarray, codes: np.ndarray):
+    seed, _, overhead, fish = saved_map
+    overhead.reshape(-1)[cells] = codes & 3
+    fish.reshape(-1)[cells] = codes >= 4
+    return seed, origin, overhead, fish
+
+
+def equipment_dict(gear: tuple) -> Dict:
+    """gear_snapshot() tuple -> the 'equipment' section of a JSON save."""
+    _, rod, leader, fly = gear
+    return {
+        "rod": dict(zip(("length", "weight", "material"), rod)) if rod else None,
+        "leader": dict(zip(("material", "tippet", "length"), leader)) if leader else None,
+        "fly": dict(zip(("pattern", "category", "size"), fly)) if fly else None,
+    }
+
+
+def gear_tuple(save_data: Dict) -> tuple:
+    """The inverse of equipment_dict, plus the location, from a JSON save."""
+    equipment = save_data.get("equipment") or {}
+    rod, leader, fly = equipment.get("rod"), equipment.get("leader"), equipment.get("fly")
+    return (
+        save_data.get("location"),
+        (rod["length"], rod["weight"], rod["material"]) if rod else None,
+        (leader["material"], leader["tippet"], leader["length"]) if leader else None,
+        (fly["pattern"], fly["category"], fly["size"]) if fly else None,
+    )
+
+
+class SaveJournal:
+    def __init__(self, path: str, snapshot_every: int = SNAPSHOT_EVERY, durable: bool = True,
+                 map_path: str | None = None):
+        self.path = path
+        # The packed map file written with snapshots; None saves no map
+        self.map_path = map_path
+        self.snapshot_every = snapshot_every
+        # fsync after every write
+        self.durable = durable
+        self._forget()
+
+    def _forget(self) -> None:
+        # What the file on disk holds, as far as this object knows
+        self._synced = False
+        self._end = 0
+        self._records = 0
+        self._player = None
+        self._gear = None
+        self._base = None
+        self._log = None
+        self._catches = 0
+        self._rng_seed = None
+        # Size of the map file, and the bytes of map records since the snapshot
+        self._map_size = 0
+        self._map_logged = 0
+        self._origin = None
+        # process species id -> species id used inside the file
+        self._file_ids: Dict[int, int] = {}
+
+    def save(self, game, map_cells: tuple | None = None) -> int:
+        """Persist game's player, gear, catches, random stream and map; return the bytes written.
+
+        map_cells is (view_origin, cell indices, codes) for the cells that
+        changed since the last save, or None to write the whole map.
+        """
+        player = game.player
+        return self.save_state(
+            (player.name, player.level, player.xp),
+            game.gear_snapshot(),
+            (game.seed, game.grid_size),
+            player.catch_record,
+            game.resume_seed(),
+            map_cells,
+            game.map_bytes if self.map_path else None,
+        )
+
+    def save_state(self, player: tuple, gear: tuple, base: tuple, log: CatchLog,
+                   rng_seed: int | None = None, map_cells: tuple | None = None,
+                   map_bytes=None) -> int:
+        """Like save(), from plain values: (name, level, xp), gear_snapshot(), (seed, grid_size).
+
+        rng_seed is the seed the game's random stream resumes from, if known.
+        map_bytes returns the packed map when the journal has to write it
+        whole; without it no map is saved.
+        """
+        map_cost = 0
+        if map_bytes is not None and map_cells is not None:
+            cells = len(map_cells[1])
+            if cells or map_cells[0] != self._origin:
+                map_cost = MAP_HEAD.size + MAP_CELL_BYTES * cells
+        if (
+            not self._synced
+            or log is not self._log
+            or len(log) < self._catches
+            or base != self._base
+            # A new map, or cell records that would outgrow the map file
+            or (map_bytes is not None and map_cells is None)
+            or self._map_logged + map_cost > self._map_size
+        ):
+            return self._write_snapshot(player, gear, base, log, rng_seed, map_bytes)
+
+        records = []
+        if gear != self._gear:
+            records.append(_frame(EQUIPMENT_EVENT, json.dumps(gear).encode()))
+        file_ids = self._file_ids
+        for i in range(self._catches, len(log)):
+            sid = log.species_ids[i]
+            fid = file_ids.get(sid)
+            if fid is None:
+                fid = file_ids[sid] = len(file_ids)
+                records.append(_frame(SPECIES_EVENT, SPECIES.pack(fid) + SPECIES_NAMES[sid].encode()))
+            records.append(_frame(CATCH_EVENT, CATCH.pack(fid, log.sizes[i])))
+        if player != self._player:
+            name, level, xp = player
+            records.append(_frame(PLAYER_EVENT, PLAYER.pack(level, xp) + name.encode()))
+        if rng_seed is not None and rng_seed != self._rng_seed:
+            records.append(_frame(RNG_EVENT, RNG.pack(rng_seed)))
+        if map_cost:
+            origin, cells, codes = map_cells
+            records.append(_frame(MAP_EVENT, b"".join((
+                MAP_HEAD.pack(*origin, len(cells)),
+                np.asarray(cells, dtype="<u4").tobytes(),
+                np.asarray(codes, dtype=np.uint8).tobytes(),
+            ))))
+        if not records:
+            return 0
+        if self._records + len(records) > self.snapshot_every:
+            return self._write_snapshot(player, gear, base, log, rng_seed, map_bytes)
+
+        data = b"".join(records)
+        try:
+            with open(self.path, "r+b") as f:
+                # Anything past the last good record is a torn write; overwrite it
+                f.seek(self._end)
+                f.write(data)
+                f.truncate()
+                self._flush(f)
+        except FileNotFoundError:
+            return self._write_snapshot(player, gear, base, log, rng_seed, map_bytes)
+        self._end += len(data)
+        self._records += len(records)
+        self._player, self._gear, self._catches = player, gear, len(log)
+        if rng_seed is not None:
+            self._rng_seed = rng_seed
+        if map_cost:
+            self._map_logged += map_cost
+            self._origin = map_cells[0]
+        return len(data)
+
+    def _write_snapshot(self, player: tuple, gear: tuple, base: tuple, log: CatchLog,
+                        rng_seed: int | None, map_bytes=None) -> int:
+        # The map goes first: if the snapshot never makes it, the old one's
+        # map_crc no longer matches and the stale map is simply not used
+        map_crc = None
+        written = 0
+        self._map_logged = 0
+        self._origin = None
+        if map_bytes is not None:
+            packed = map_bytes()
+            write_map(self.map_path, packed)
+            map_crc = zlib.crc32(packed)
+            written = self._map_size = len(packed)
+            self._origin = MAP_HEADER.unpack_from(packed)[3:]
+        # Process species ids are small and dense, so the snapshot reuses them as file ids
+        species = SPECIES_NAMES[:max(log.species_ids, default=-1) + 1]
+        name, level, xp = player
+        header = json.dumps({
+            "name": name,
+            "level": level,
+            "xp": xp,
+            "gear": gear,
+            "seed": base[0],
+            "grid_size": base[1],
+            "rng_seed": rng_seed,
+            "map_crc": map_crc,
+            "species": species,
+            "catches": len(log),
+        }).encode()
+        payload = b"".join((
+            SNAPSHOT_HEAD.pack(len(header)),
+            header,
+            _column_bytes(log.species_ids),
+            _column_bytes(log.sizes),
+        ))
+        data = MAGIC + _frame(SNAPSHOT, payload)
+
+        tmp = self.path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+            self._flush(f)
+        os.replace(tmp, self.path)
+
+        self._synced = True
+        self._end = len(data)
+        self._records = 0
+        self._player, self._gear, self._base = player, gear, base
+        self._log, self._catches = log, len(log)
+        self._rng_seed = rng_seed
+        self._file_ids = {sid: sid for sid in range(len(species))}
+        return written + len(data)
+
+    def _flush(self, f) -> None:
+        f.flush()
+        if self.durable:
+            os.fsync(f.fileno())
+
+    def load(self) -> Dict:
+        """Read the snapshot and replay the records after it.
+
+        Returns a dict shaped like a JSON save, except that
+        player.catch_record is a CatchLog and "map", when the journal has a
+        map file that belongs to its snapshot, is read_map() output with the
+        cell records applied. Later saves through this journal append to the
+        file.
+        """
+        with open(self.path, "rb") as f:
+            data = f.read()
+        if not data.startswith(MAGIC):
+            raise JournalError(f"{self.path} is not a save journal")
+
+        view = memoryview(data)
+        pos = len(MAGIC)
+        names: List[str] = []
+        log = None
+        records = 0
+        map_events = []
+        map_logged = 0
+        while pos + FRAME.size <= len(data):
+            length, crc = FRAME.unpack_from(data, pos)
+            body = view[pos + FRAME.size:pos + FRAME.size + length]
+            if length == 0 or len(body) < length or zlib.crc32(body) != crc:
+                break
+            kind, payload = body[0], body[1:]
+
+            if kind == SNAPSHOT:
+                (head_len,) = SNAPSHOT_HEAD.unpack_from(payload)
+                head = json.loads(bytes(payload[SNAPSHOT_HEAD.size:SNAPSHOT_HEAD.size + head_len]))
+                columns = SNAPSHOT_HEAD.size + head_len
+                n = head["catches"]
+                file_ids = _column_from(payload[columns:columns + 2 * n])
+                sizes = _column_from(payload[columns + 2 * n:columns + 4 * n])
+                names = list(head["species"])
+                to_process = [species_id(name) for name in names]
+                if to_process != list(range(len(names))):
+                    file_ids = array("H", [to_process[fid] for fid in file_ids])
+                log = CatchLog.from_columns(file_ids, sizes)
+                player = (head["name"], head["level"], head["xp"])
+                gear = tuple(head["gear"])
+                base = (head["seed"], head["grid_size"])
+                # Journals written before the stream was saved don't have it
+                rng_seed = head.get("rng_seed")
+                # Older journals don't record which map file goes with them
+                map_crc = head.get("map_crc", -1)
+                map_events = []
+                map_logged = 0
+                records = 0
+            elif log is None:
+                raise JournalError(f"{self.path} does not start with a snapshot")
+            elif kind == PLAYER_EVENT:
+                level, xp = PLAYER.unpack_from(payload)
+                player = (bytes(payload[PLAYER.size:]).decode(), level, xp)
+                records += 1
+            elif kind == EQUIPMENT_EVENT:
+                gear = tuple(json.loads(bytes(payload)))
+                records += 1
+            elif kind == SPECIES_EVENT:
+                (fid,) = SPECIES.unpack_from(payload)
+                names[fid:fid + 1] = [bytes(payload[SPECIES.size:]).decode()]
+                records += 1
+            elif kind == CATCH_EVENT:
+                fid, size = CATCH.unpack_from(payload)
+                log.append(names[fid], size)
+                records += 1
+            elif kind == RNG_EVENT:
+                (rng_seed,) = RNG.unpack_from(payload)
+                records += 1
+            elif kind == MAP_EVENT:
+                row, col, n = MAP_HEAD.unpack_from(payload)
+                cells = np.frombuffer(payload, dtype="<u4", count=n, offset=MAP_HEAD.size)
+                codes = np.frombuffer(payload, dtype=np.uint8, count=n,
+                                      offset=MAP_HEAD.size + 4 * n)
+                map_events.append(((row, col), cells, codes))
+                map_logged += MAP_HEAD.size + MAP_CELL_BYTES * n
+                records += 1
+            else:
+                break
+            pos += FRAME.size + length
+
+        if log is None:
+            raise JournalError(f"{self.path} has no readable snapshot")
+
+        # JSON round-trips the gear's inner tuples as lists
+        gear = tuple(tuple(part) if isinstance(part, list) else part for part in gear)
+        self._synced = True
+        self._end = pos
+        self._records = records
+        self._player, self._gear, self._base = player, gear, base
+        self._log, self._catches = log, len(log)
+        self._rng_seed = rng_seed
+        self._file_ids = {species_id(name): fid for fid, name in enumerate(names)}
+
+        saved_map = None
+        if self.map_path and map_crc is not None and os.path.exists(self.map_path):
+            saved_map = read_map(self.map_path, None if map_crc == -1 else map_crc)
+        if saved_map is not None:
+            for origin, cells, codes in map_events:
+                saved_map = _apply_cells(saved_map, origin, cells, codes)
+            self._map_size = os.path.getsize(self.map_path)
+            self._map_logged = map_logged
+            self._origin = saved_map[1]
+        elif self.map_path:
+            # Nothing to append cell records to: the next save writes the map whole
+            self._synced = False
+
+        name, level, xp = player
+        save_data = {
+            "player": {"name": name, "level": level, "xp": xp, "catch_record": log},
+            "equipment": equipment_dict(gear),
+            "location": gear[0],
+            "grid_size": base[1],
+            "seed": base[0],
+            "rng_seed": rng_seed,
+        }
+        if saved_map is not None:
+            save_data["map"] = saved_map
+        return save_data
+
+
+def export_json(journal_path: str, json_path: str) -> None:
+    save_data = SaveJournal(journal_path).load()
+    save_data["player"]["catch_record"] = save_data["player"]["catch_record"].to_list()
+    with open(json_path, "w") as f:
+        json.dump(save_data, f, indent=2)
+
+
+def import_json(json_path: str, journal_path: str) -> None:
+    with open(json_path, "r") as f:
+        save_data = json.load(f)
+    player = save_data["player"]
+    seed = save_data.get("seed")
+    # Saves from before seeds were kept get a new one, as a new game would
+    seed = random.SystemRandom().getrandbits(63) if seed is None else check_seed(seed)
+    rng_seed = save_data.get("rng_seed")
+    SaveJournal(journal_path).save_state(
+        (player["name"], player["level"], player["xp"]),
+        gear_tuple(save_data),
+        (seed, save_data.get("grid_size", 10)),
+        CatchLog.from_pairs(player["catch_record"]),
+        None if rng_seed is None else check_seed(rng_seed),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert between FFRPG JSON saves and save journals")
+    parser.add_argument("command", choices=["export", "import"])
+    parser.add_argument("source")
+    parser.add_argument("dest")
+    args = parser.parse_args()
+
+    if args.command == "export":
+        export_json(args.source, args.dest)
+    else:
+        import_json(args.source, args.dest)
+
+
+if __name__ == "__main__":
+    main()
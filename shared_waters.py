@@ -0,0 +1,198 @@
+"""One location's map, fished by many games at the same time.
+
+Each game keeps its own player, gear, random stream and view; only the
+map is shared. The map is split into REGION_SIZE x REGION_SIZE regions,
+each with its own lock and version number:
+
+- A cast holds the locks of the regions under its bite window, from
+  the fish scan to the catch. Casts in different parts of the map never
+  wait on each other. Locks are always taken in ascending region order,
+  so two casts that straddle the same regions can't deadlock.
+- Every write bumps its region's version after the cells change.
+  Renderers compare versions to find the rows other games redrew, and
+  they read the grids without taking any lock.
+- Fish movement is the one whole-map operation. The first game to
+  notice a tick due takes every region lock once and steps the school.
+  Catches and spooks from casts are folded into the school then, so a
+  cast never touches the school's arrays.
+
+Games join through FFRPG.join_waters, or through set_location when the
+game has a SharedLocations.
+"""
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from fish_index import FishIndex
+from main import (
+    BITE_RADIUS,
+    FFRPG,
+    FISH,
+    FISH_TICK_SECONDS,
+    MAX_CATCHUP_TICKS,
+    WATER,
+    FishSchool,
+    location_type_for,
+)
+
+
+# Side of the square map regions that are locked and versioned together
+REGION_SIZE = 8
+
+
+class SharedWaters:
+    def __init__(self, location: str, grid_size: int = 10, map_seed: int | None = None,
+                 region_size: int = REGION_SIZE):
+        generator = FFRPG(grid_size, seed=map_seed, record=False)
+        generator.generate_location(location_type_for(location), map_seed)
+        self.location = location
+        self.grid_size = grid_size
+        self.fishfinder_grid = generator.fishfinder_grid
+        self.overhead_grid = generator.overhead_grid
+        self.region_size = region_size
+        regions = -(-grid_size // region_size)
+        self._regions = regions
+        self._locks = [threading.Lock() for _ in range(regions * regions)]
+        # versions[i, j] counts the writes to region (i, j)
+        self.versions = np.zeros((regions, regions), dtype=np.int64)
+        self.fish_tick_seconds = FISH_TICK_SECONDS
+        self._fish_clock = time.monotonic()
+        self._fish_rng = np.random.default_rng(generator.rng.getrandbits(64))
+        self._school = FishSchool(self.fishfinder_grid == FISH)
+        # Casts since the last tick, applied to the school by the next one
+        self._spooks: deque = deque()
+        self._tick_lock = threading.Lock()
+        self._index = None
+        self._index_version = None
+
+    def _region_ids(self, row0: int, row1: int, col0: int, col1: int) -> List[int]:
+        # Regions overlapping rows row0..row1 and cols col0..col1 (inclusive), in lock order
+        size, last = self.region_size, self.grid_size - 1
+        rows = range(max(row0, 0) // size, min(row1, last) // size + 1)
+        cols = range(max(col0, 0) // size, min(col1, last) // size + 1)
+        return [i * self._regions + j for i in rows for j in cols]
+
+    @contextmanager
+    def hold(self, row: int, col: int, radius: int = BITE_RADIUS):
+        """Lock the regions within radius of (row, col) for one cast."""
+        locks = [self._locks[i] for i in self._region_ids(row - radius, row + radius, col - radius, col + radius)]
+        for lock in locks:
+            lock.acquire()
+        try:
+            yield
+        finally:
+            for lock in reversed(locks):
+                lock.release()
+
+    @contextmanager
+    def hold_all(self):
+        """Lock the whole map, e.g. to move the fish."""
+        for lock in self._locks:
+            lock.acquire()
+        try:
+            yield
+        finally:
+            for lock in reversed(self._locks):
+                lock.release()
+
+    def touch(self, row: int, col: int) -> None:
+        """Record a write to (row, col); the caller holds its region."""
+        self.versions[row // self.region_size, col // self.region_size] += 1
+
+    def count_within(self, row: int, col: int, radius: int = BITE_RADIUS) -> int:
+        """Fish within radius of (row, col), read straight off the grid.
+
+        The window is a few cells, so this beats keeping a summed-area
+        table in step with every other game's catches.
+        """
+        window = self.fishfinder_grid[max(row - radius, 0):row + radius + 1, max(col - radius, 0):col + radius + 1]
+        return int(np.count_nonzero(window == FISH))
+
+    def remove_fish(self, row: int, col: int) -> bool:
+        """Take the fish at (row, col); the caller holds its region."""
+        if self.fishfinder_grid[row, col] != FISH:
+            return False
+        self.fishfinder_grid[row, col] = WATER
+        self.touch(row, col)
+        return True
+
+    def spook(self, row: int, col: int) -> None:
+        self._spooks.append((row, col))
+
+    def fish_index(self) -> Tuple[int, FishIndex]:
+        """(version, FishIndex) for whole-map views such as the heatmap.
+
+        Rebuilt from the grid when any region has changed; the version is
+        the total of the region versions, so it only ever grows.
+        """
+        version = int(self.versions.sum())
+        if version != self._index_version:
+            self._index = FishIndex(self.fishfinder_grid == FISH)
+            self._index_version = version
+        return version, self._index
+
+    def tick_fish(self, now: float | None = None) -> int:
+        """Move the fish for the wall-clock ticks that are due; returns the ticks run.
+
+        Called by every game using the waters. Only one of them runs a due
+        tick; the rest return 0 straight away. Callers must not hold any
+        region lock.
+        """
+        if self.fish_tick_seconds is None:
+            return 0
+        if now is None:
+            now = time.monotonic()
+        if now - self._fish_clock < self.fish_tick_seconds or not self._tick_lock.acquire(blocking=False):
+            return 0
+        try:
+            ticks = int((now - self._fish_clock) // self.fish_tick_seconds)
+            if ticks <= 0:
+                return 0
+            self._fish_clock += ticks * self.fish_tick_seconds
+            ticks = min(ticks, MAX_CATCHUP_TICKS)
+            self.advance_fish(ticks)
+            return ticks
+        finally:
+            self._tick_lock.release()
+
+    def advance_fish(self, ticks: int) -> None:
+        """Run `ticks` movement steps now, whatever the clock says."""
+        with self.hold_all():
+            school, grid = self._school, self.fishfinder_grid
+            # Drop the fish games have caught since the last tick
+            school._keep(grid[school.rows, school.cols] == FISH)
+            while self._spooks:
+                school.spook(*self._spooks.popleft())
+            moved = [school.step(grid, self._fish_rng) for _ in range(ticks)]
+            rows = np.unique(np.concatenate(moved)) if moved else []
+            if len(rows):
+                # Moves change the odds of the rows around them too
+                near = np.unique(np.clip(rows // self.region_size, 0, self._regions - 1))
+                self.versions[near] += 1
+
+
+class SharedLocations:
+    """One SharedWaters per location name, created the first time it's asked for."""
+
+    def __init__(self, grid_size: int = 10, seed: int | None = None, region_size: int = REGION_SIZE):
+        self.grid_size = grid_size
+        self.region_size = region_size
+        self._seeds = np.random.default_rng(seed)
+        self._waters: Dict[str, SharedWaters] = {}
+        self._lock = threading.Lock()
+
+    def get(self, location: str) -> SharedWaters:
+        waters = self._waters.get(location)
+        if waters is None:
+            with self._lock:
+                waters = self._waters.get(location)
+                if waters is None:
+                    map_seed = int(self._seeds.integers(2 ** 63))
+                    waters = self._waters[location] = SharedWaters(
+                        location, self.grid_size, map_seed, self.region_size
+                    )
+        return waters
@@ -0,0 +1,248 @@
+"""Headless Monte Carlo estimates of catch rate and XP per cast.
+
+This runs the web game's cast rules from main.py (the OddsEngine tables
+and the automated fight) on NumPy arrays, a whole chunk of casts
+at a time, instead of going through start_fishing_web cast by cast.
+
+Every simulated cast lands on a uniformly chosen water cell of one of a set
+of freshly generated maps for the location. Casts are independent: catches
+don't deplete the maps. Chunks get their own seeds spawned from one root
+seed and run on a process pool, so a given seed gives the same report
+whatever the number of workers.
+
+    python simulate.py --location "Alpine Lake" --fly-category Streamers --casts 5000000
+"""
+import argparse
+import json
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List
+
+import numpy as np
+
+from main import (
+    BITE_RADIUS,
+    FIGHT_ROUND_WIN_CHANCE,
+    FIGHT_ROUNDS,
+    FISH_TYPES,
+    FLY_CATEGORIES,
+    FFRPG,
+    LAND,
+    ROUNDS_TO_LAND,
+    XP_PER_INCH,
+    location_type_for,
+    odds_for,
+)
+
+
+# Two-sided 95% normal quantile used for every confidence interval
+Z_95 = 1.959963984540054
+
+MAX_SIZE = 64
+
+
+def nearby_fractions(location: str, grid_size: int, maps: int, seed: int) -> np.ndarray:
+    """Share of water cells with a fish within BITE_RADIUS, for each of `maps` maps."""
+    fractions = np.empty(maps)
+    game = FFRPG(grid_size, seed=seed, record=False)
+    for i in range(maps):
+        game.generate_location(location_type_for(location))
+        water = game.fishfinder_grid != LAND
+        near = game.fish_index.count_grid(BITE_RADIUS) > 0
+        fractions[i] = near[water].mean() if water.any() else 0.0
+    return fractions
+
+
+def _run_chunk(job) -> Dict:
+    location, fly_category, rod_weight, grid_size, casts, maps, seed_seq = job
+    rng = np.random.default_rng(seed_seq)
+
+    near_fraction = nearby_fractions(location, grid_size, maps, int(rng.integers(2**63)))
+    nearby = rng.random(casts) < near_fraction[rng.integers(0, maps, size=casts)]
+
+    odds = odds_for(location, fly_category, rod_weight)
+    p_bite = np.where(nearby, odds.bite[True], odds.bite[False])
+    bites = int(np.count_nonzero(rng.random(casts) < p_bite))
+
+    # Species, size and fight are only drawn for casts that got a bite
+    species = odds.species
+    ranges = np.array([odds.sizes[name] for name in species])
+    picks = rng.integers(0, len(species), size=bites)
+    sizes = rng.integers(ranges[picks, 0], ranges[picks, 1] + 1)
+    landed = rng.binomial(FIGHT_ROUNDS, FIGHT_ROUND_WIN_CHANCE, size=bites) >= ROUNDS_TO_LAND
+
+    return {
+        "casts": casts,
+        "nearby": int(np.count_nonzero(nearby)),
+        "bites": bites,
+        "size_counts": np.bincount(sizes[landed], minlength=MAX_SIZE + 1),
+        "species_counts": np.bincount(picks[landed], minlength=len(species)),
+    }
+
+
+class SimulationReport:
+    """Merged totals of a simulation run, with derived rates and intervals."""
+
+    def __init__(self, location: str, fly_category: str, rod_weight: int, chunks: List[Dict]):
+        self.location = location
+        self.fly_category = fly_category
+        self.rod_weight = rod_weight
+        self.species = FISH_TYPES.get(location, ["Generic Fish"])
+        self.casts = sum(c["casts"] for c in chunks)
+        self.nearby = sum(c["nearby"] for c in chunks)
+        self.bites = sum(c["bites"] for c in chunks)
+        self.size_counts = sum(c["size_counts"] for c in chunks)
+        self.species_counts = sum(c["species_counts"] for c in chunks)
+        self.landed = int(self.size_counts.sum())
+
+    @property
+    def catch_rate(self) -> float:
+        return self.landed / self.casts
+
+    @property
+    def bite_rate(self) -> float:
+        return self.bites / self.casts
+
+    def catch_rate_ci(self) -> tuple:
+        """Wilson 95% interval for the per-cast catch probability."""
+        n, p = self.casts, self.catch_rate
+        centre = (p + Z_95 ** 2 / (2 * n)) / (1 + Z_95 ** 2 / n)
+        half = Z_95 * math.sqrt(p * (1 - p) / n + Z_95 ** 2 / (4 * n * n)) / (1 + Z_95 ** 2 / n)
+        return centre - half, centre + half
+
+    def _moments(self, values: np.ndarray, counts: np.ndarray, n: int) -> tuple:
+        mean = float((values * counts).sum()) / n
+        var = float(((values - mean) ** 2 * counts).sum()) / max(n - 1, 1)
+        half = Z_95 * math.sqrt(var / n)
+        return mean, (mean - half, mean + half)
+
+    def xp_per_cast(self) -> tuple:
+        """Mean XP per cast and its 95% interval; casts without a fish score 0."""
+        sizes = np.arange(self.size_counts.size)
+        values = np.append(sizes * XP_PER_INCH, 0)
+        counts = np.append(self.size_counts, self.casts - self.landed)
+        return self._moments(values, counts, self.casts)
+
+    def size_per_fish(self) -> tuple:
+        """Mean size of a landed fish and its 95% interval."""
+        if not self.landed:
+            return 0.0, (0.0, 0.0)
+        return self._moments(np.arange(self.size_counts.size), self.size_counts, self.landed)
+
+    def size_distribution(self) -> Dict[int, float]:
+        return {
+            int(size): count / self.landed
+            for size, count in enumerate(self.size_counts.tolist())
+            if count
+        }
+
+    def xp_distribution(self) -> Dict[int, float]:
+        """Probability of each XP amount on a single cast."""
+        dist = {0: (self.casts - self.landed) / self.casts}
+        for size, count in enumerate(self.size_counts.tolist()):
+            if count:
+                dist[size * XP_PER_INCH] = count / self.casts
+        return dist
+
+    def to_dict(self) -> Dict:
+        xp_mean, xp_ci = self.xp_per_cast()
+        size_mean, size_ci = self.size_per_fish()
+        return {
+            "location": self.location,
+            "fly_category": self.fly_category,
+            "rod_weight": self.rod_weight,
+            "casts": self.casts,
+            "fish_nearby_rate": self.nearby / self.casts,
+            "bite_rate": self.bite_rate,
+            "catch_rate": self.catch_rate,
+            "catch_rate_ci95": list(self.catch_rate_ci()),
+            "xp_per_cast": xp_mean,
+            "xp_per_cast_ci95": list(xp_ci),
+            "size_mean": size_mean,
+            "size_mean_ci95": list(size_ci),
+            "species": dict(zip(self.species, self.species_counts.tolist())),
+            "size_distribution": self.size_distribution(),
+            "xp_distribution": self.xp_distribution(),
+        }
+
+    def __str__(self):
+        low, high = self.catch_rate_ci()
+        xp_mean, (xp_low, xp_high) = self.xp_per_cast()
+        size_mean, (size_low, size_high) = self.size_per_fish()
+        lines = [
+            f"{self.location} / {self.fly_category} / {self.rod_weight}-weight rod",
+            f"casts:          {self.casts:,}",
+            f"fish nearby:    {self.nearby / self.casts:.4f}",
+            f"bite rate:      {self.bite_rate:.4f}",
+            f"catch rate:     {self.catch_rate:.4f}  (95% CI {low:.4f} - {high:.4f})",
+            f"XP per cast:    {xp_mean:.3f}  (95% CI {xp_low:.3f} - {xp_high:.3f})",
+            f"size per fish:  {size_mean:.2f} in  (95% CI {size_low:.2f} - {size_high:.2f})",
+        ]
+        for name, count in zip(self.species, self.species_counts.tolist()):
+            lines.append(f"  {name:<20} {count / max(self.landed, 1):.3f}")
+        return "\n".join(lines)
+
+
+def simulate(
+    location: str,
+    fly_category: str,
+    rod_weight: int,
+    casts: int = 1_000_000,
+    seed: int | None = None,
+    workers: int | None = None,
+    chunk_size: int = 250_000,
+    maps_per_chunk: int = 32,
+    grid_size: int = 10,
+) -> SimulationReport:
+    """Simulate `casts` casts with the given gear at a named location.
+
+    Only the fly category and rod weight affect the odds today, so those
+    are the only gear fields taken. workers defaults to every core; pass 1
+    to stay in-process.
+    """
+    n_chunks = max(1, math.ceil(casts / chunk_size))
+    seeds = np.random.SeedSequence(seed).spawn(n_chunks)
+    jobs = [
+        (
+            location, fly_category, rod_weight, grid_size,
+            min(chunk_size, casts - i * chunk_size), maps_per_chunk, seeds[i],
+        )
+        for i in range(n_chunks)
+    ]
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or n_chunks == 1:
+        chunks = [_run_chunk(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, n_chunks)) as pool:
+            chunks = list(pool.map(_run_chunk, jobs))
+    return SimulationReport(location, fly_category, rod_weight, chunks)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo catch-rate simulation for FFRPG")
+    parser.add_argument("--location", default="Mountain Stream", choices=list(FISH_TYPES))
+    parser.add_argument("--fly-category", default="Dry Flies", choices=FLY_CATEGORIES)
+    parser.add_argument("--rod-weight", type=int, default=5)
+    parser.add_argument("--casts", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--grid-size", type=int, default=10)
+    parser.add_argument("--json", action="store_true", help="print the full report as JSON")
+    args = parser.parse_args()
+
+    report = simulate(
+        args.location,
+        args.fly_category,
+        args.rod_weight,
+        casts=args.casts,
+        seed=args.seed,
+        workers=args.workers,
+        grid_size=args.grid_size,
+    )
+    print(json.dumps(report.to_dict(), indent=2) if args.json else report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Redraws the console frame in place with ANSI escape sequences.
+
+display_game used to clear the screen by running `clear` (or `cls`) in a
+subshell before every frame. TerminalRenderer keeps the last frame it
+drew and sends only what changed, in a single write:
+
+- Each changed line gets one cursor move plus its changed span of
+  characters, or the rest of the line if the line's length changed.
+- The frame stays pinned to the top of the screen. The lines below it
+  become the terminal's scroll region, so menus, prompts and fight text
+  scroll there without moving the frame, and every draw clears them.
+- The whole frame is repainted (still one write) on the first draw,
+  after a resize, or when the frame's height changes.
+- Lines are cut at the window's right edge, since a wrapped line would
+  push every row below it down. The frame is at least 83 columns wide,
+  so on an 80-column terminal the last few columns go unseen but the
+  diffs keep working. A frame taller than the window is written out in
+  full every time, because it scrolls.
+
+When the stream isn't a terminal, frames are written out as plain text.
+"""
+import os
+import shutil
+import sys
+from typing import Iterator, List, TextIO, Tuple
+
+ESC = "\x1b["
+HOME_CLEAR = ESC + "H" + ESC + "2J"
+# Makes the whole screen the scroll region again
+RESET_REGION = ESC + "r"
+
+
+def line_changes(old: List[str], new: List[str]) -> Iterator[Tuple[int, int, str, bool]]:
+    """Yield (line, column, text, to_end) for each line that differs.
+
+    text replaces the line from column on: just the changed span when the
+    line kept its length, or the whole rest of the line (to_end) when it didn't.
+    """
+    for y, (before, after) in enumerate(zip(old, new)):
+        if before == after:
+            continue
+        start, end = 0, min(len(before), len(after))
+        while start < end and before[start] == after[start]:
+            start += 1
+        if len(before) == len(after):
+            stop = len(after)
+            while before[stop - 1] == after[stop - 1]:
+                stop -= 1
+            yield y, start, after[start:stop], False
+        else:
+            yield y, start, after[start:], True
+
+
+class TerminalRenderer:
+    def __init__(self, stream: TextIO | None = None, ansi: bool | None = None):
+        self.stream = stream if stream is not None else sys.stdout
+        self.ansi = self.stream.isatty() if ansi is None else ansi
+        self._lines: List[str] | None = None
+        self._size = None
+        # True while the frame is pinned above a scroll region
+        self._pinned = False
+        if self.ansi and os.name == "nt":
+            # An empty command turns on escape-sequence handling in the Windows console, once
+            os.system("")
+
+    def reset(self) -> None:
+        """Forget the last frame, so the next draw repaints the screen."""
+        self._lines = None
+
+    def close(self) -> None:
+        """Hand the whole screen back to ordinary scrolling output."""
+        if self._pinned:
+            self._write(f"{RESET_REGION}{ESC}{self._size[1]};1H\n")
+            self._pinned = False
+        self._lines = None
+
+    def draw(self, text: str) -> None:
+        if not self.ansi:
+            self._write(text + "\n")
+            return
+
+        size = tuple(shutil.get_terminal_size())
+        columns, rows = size
+        lines = [line[:columns] for line in text.split("\n")]
+        height = len(lines)
+        if height >= rows:
+            out = [RESET_REGION if self._pinned else "", HOME_CLEAR, text, "\n"]
+            self._pinned = False
+            self._lines = None
+        else:
+            if self._lines is None or size != self._size or height != len(self._lines):
+                # Setting the scroll region homes the cursor, so it goes first
+                # Each line is placed on its own row: one that fills the width
+                # leaves some terminals waiting to wrap, so a newline could skip a row
+                out = [f"{ESC}{height + 1};{rows}r", HOME_CLEAR]
+                out += [f"{ESC}{y + 1};1H{line}" for y, line in enumerate(lines)]
+                self._pinned = True
+            else:
+                out = self._changes(lines)
+            # Park the cursor under the frame and clear what the last menu left there
+            out.append(f"{ESC}{height + 1};1H{ESC}J")
+            self._lines = lines
+        self._size = size
+        self._write("".join(out))
+
+    def _changes(self, lines: List[str]) -> List[str]:
+        return [
+            f"{ESC}{y + 1};{x + 1}H{text}{ESC + 'K' if to_end else ''}"
+            for y, x, text, to_end in line_changes(self._lines, lines)
+        ]
+
+    def _write(self, data: str) -> None:
+        self.stream.write(data)
+        self.stream.flush()